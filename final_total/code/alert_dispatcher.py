@@ -0,0 +1,121 @@
+# alert_dispatcher.py
+
+import queue
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from telemetry import LatencyCounter
+
+LINE_NOTIFY_URL = 'https://notify-api.line.me/api/notify'
+
+
+class AlertDispatcher:
+    # 背景執行緒負責傳送 LINE Notify，偵測迴圈只需把告警放進佇列，不會等待網路
+    # url 可以換成本機的測試伺服器
+    def __init__(self, line_token, url=LINE_NOTIFY_URL, max_queue=16, max_retries=3, backoff=0.5, timeout=10,
+                 telemetry=None):
+        self.url = url
+        self.telemetry = telemetry
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        # 持續使用同一個 Session，連線可以重複利用
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({'Authorization': f'Bearer {line_token}'})
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.closed = False  # close() 之後的告警直接丟棄
+        # 從放進佇列到傳送成功的時間
+        self.latency = LatencyCounter("alert_delivery")
+        self.thread = threading.Thread(target=self.worker, daemon=True)
+        self.thread.start()
+
+    def send(self, image_path, current_time):
+        if self.closed:
+            self.dropped += 1
+            return
+        item = (image_path, current_time, time.perf_counter())
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                return
+            except queue.Full:
+                # 佇列滿了就丟掉最舊的告警
+                try:
+                    self.queue.get_nowait()
+                    self.queue.task_done()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def worker(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    break
+                self.deliver(*item)
+            except Exception as e:
+                self.failed += 1
+                print(f"告警傳送發生錯誤：{e}")
+            finally:
+                self.queue.task_done()
+
+    def deliver(self, image_path, current_time, queued_at):
+        data = {'message': f"{current_time.year}年{current_time.month}月{current_time.day}日 {current_time.hour:02}:{current_time.minute:02}:{current_time.second:02}"}
+        status = None
+        for attempt in range(self.max_retries + 1):
+            try:
+                with open(image_path, 'rb') as image_file:
+                    response = self.session.post(self.url, data=data, files={'imageFile': image_file}, timeout=self.timeout)
+            except requests.RequestException as e:
+                status = type(e).__name__
+            except OSError as e:
+                # 圖片讀不到，重試也沒有用
+                status = type(e).__name__
+                break
+            else:
+                status = response.status_code
+                if status == 200:
+                    self.sent += 1
+                    self.latency.add(time.perf_counter() - queued_at)
+                    if self.telemetry is not None:
+                        self.telemetry.record("alert_delivery", time.perf_counter() - queued_at)
+                    print("圖片已成功傳送到 LINE Notify")
+                    return
+                # 4xx（429 除外）重試也沒有用
+                if status < 500 and status != 429:
+                    break
+            if attempt < self.max_retries:
+                time.sleep(self.backoff * (2 ** attempt))
+        self.failed += 1
+        print(f"圖片傳送失敗，狀態碼：{status}")
+
+    def flush(self, timeout=5):
+        # 等待佇列中的告警送完，最多等 timeout 秒
+        deadline = time.perf_counter() + timeout
+        while self.queue.unfinished_tasks and time.perf_counter() < deadline:
+            time.sleep(0.05)
+        print(self.summary())
+
+    def close(self, timeout=5):
+        # 送完佇列中的告警後結束背景執行緒並關閉連線，可重複呼叫
+        if self.closed:
+            return
+        self.closed = True
+        self.flush(timeout)
+        try:
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self.thread.join(timeout=timeout)
+        self.session.close()
+
+    def summary(self):
+        return f"LINE Notify：成功 {self.sent}，失敗 {self.failed}，丟棄 {self.dropped}，{self.latency.summary()}"
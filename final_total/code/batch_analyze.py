@@ -0,0 +1,196 @@
+# batch_analyze.py
+
+import argparse
+import csv
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import cv2
+from fall_detection_logic import FallDetectionLogic
+from model_registry import get_model
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".flv", ".wmv")
+EVENT_FIELDS = ["file", "frame", "time_sec", "time", "event_id", "track_id", "x1", "y1", "x2", "y2",
+                "vertical_velocity", "aspect_ratio"]
+
+# 每個 worker 行程各自的模型與設定
+worker_state = {}
+
+
+def find_videos(inputs):
+    # 輸入可以是資料夾、檔案或萬用字元
+    videos = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for name in sorted(os.listdir(item)):
+                if name.lower().endswith(VIDEO_EXTENSIONS):
+                    videos.append(os.path.join(item, name))
+        else:
+            videos.extend(sorted(glob.glob(item)))
+    return videos
+
+
+def init_worker(model_path, backend, threads, fall_class_id, save_snapshots):
+    # 每個 worker 只載入一次模型
+    worker_state["model_path"] = model_path
+    worker_state["model"] = get_model(model_path, backend, threads)
+    worker_state["fall_class_id"] = fall_class_id
+    worker_state["save_snapshots"] = save_snapshots
+
+
+def format_time(seconds):
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(int(minutes), 60)
+    return f"{hours:02}:{minutes:02}:{seconds:05.2f}"
+
+
+def split_chunks(video_path, chunks, overlap_seconds):
+    # 把一部長影片切成 chunks 段幀範圍，每段往前多讀 overlap 幀，讓時間確認邏輯在邊界也能運作
+    cap = cv2.VideoCapture(video_path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    cap.release()
+    if chunks <= 1 or total <= 0:
+        return [(video_path, 0, None, 0)]
+    fps = fps if fps and fps > 0 else 30.0
+    overlap = int(overlap_seconds * fps)
+    size = -(-total // chunks)
+    tasks = [(video_path, start, start + size, overlap) for start in range(0, total, size)]
+    # CAP_PROP_FRAME_COUNT 不一定準確，最後一段讀到影片結束
+    tasks[-1] = (video_path, tasks[-1][1], None, overlap)
+    return tasks
+
+
+def analyze_file(video_path, start_frame=0, end_frame=None, overlap_frames=0):
+    # 不顯示畫面、不傳 LINE，只回傳影片中的跌倒事件
+    # 只處理 [start_frame, end_frame) 的幀，前面多讀 overlap_frames 幀暖機，暖機段的事件不回報
+    save_dir = os.path.join("detected_falls", os.path.splitext(os.path.basename(video_path))[0])
+    logic = FallDetectionLogic(worker_state["model_path"], "", None, model=worker_state["model"], save_dir=save_dir,
+                               record_clips=False, save_snapshots=worker_state["save_snapshots"])
+    logic.verbose = False
+
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    fps = fps if fps and fps > 0 else 30.0
+    frame_index = max(0, start_frame - overlap_frames)
+    if frame_index > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+        # 部分編碼只能跳到關鍵幀，以實際位置為準
+        frame_index = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+    events = []
+    frames = 0
+    warmup_frames = 0
+    start = time.perf_counter()
+    while end_frame is None or frame_index < end_frame:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        timestamp = frame_index / fps
+        logic.detect_fall(frame, worker_state["fall_class_id"], timestamp)
+        # 暖機幀另外計算，各段的幀數加總才不會重複計算重疊的部分
+        if frame_index < start_frame:
+            warmup_frames += 1
+        else:
+            frames += 1
+        for state in logic.last_events:
+            if frame_index < start_frame:
+                continue
+            x1, y1, x2, y2 = [int(v) for v in state.box]
+            events.append({"file": video_path, "frame": frame_index, "time_sec": round(timestamp, 3),
+                           "time": format_time(timestamp), "event_id": state.event_id, "track_id": state.track_id,
+                           "x1": x1, "y1": y1, "x2": x2, "y2": y2,
+                           # 確認當下的下墜速度（身高 / 秒）與寬高比，方便人工檢視或調整門檻
+                           "vertical_velocity": round(state.vertical_velocity(), 3),
+                           "aspect_ratio": round(state.aspect_ratio(), 3)})
+        frame_index += 1
+    cap.release()
+    logic.close()
+    return {"file": video_path, "frames": frames, "warmup_frames": warmup_frames, "seconds": time.perf_counter() - start,
+            "events": events}
+
+
+class EventWriter:
+    # 依副檔名輸出 JSONL 或 CSV
+    def __init__(self, path):
+        self.file = open(path, "w", encoding="utf-8", newline="")
+        self.csv_writer = None
+        if path.lower().endswith(".csv"):
+            self.csv_writer = csv.DictWriter(self.file, fieldnames=EVENT_FIELDS)
+            self.csv_writer.writeheader()
+
+    def write(self, event):
+        if self.csv_writer is not None:
+            self.csv_writer.writerow(event)
+        else:
+            self.file.write(json.dumps(event, ensure_ascii=False) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="離線批次分析錄影檔中的跌倒事件")
+    parser.add_argument("inputs", nargs="+", help="影片資料夾、檔案或萬用字元，例如 D:/records/*.mp4")
+    parser.add_argument("--model", default="yolov11best.pt", help="模型權重路徑")
+    parser.add_argument("--backend", default="torch", choices=["torch", "onnx", "openvino", "openvino-int8"], help="推論後端")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker 行程數")
+    parser.add_argument("--output", default="fall_events.jsonl", help="輸出檔案（.jsonl 或 .csv）")
+    parser.add_argument("--fall-class-id", type=int, default=0)
+    parser.add_argument("--snapshots", action="store_true", help="同時保存跌倒畫面")
+    parser.add_argument("--chunks", type=int, default=0, help="每部影片切成幾段平行處理，0 表示只有一部影片時自動依 worker 數切段")
+    parser.add_argument("--overlap-seconds", type=float, default=3.0, help="每段往前重疊的秒數")
+    args = parser.parse_args()
+
+    videos = find_videos(args.inputs)
+    if not videos:
+        print("找不到影片")
+        raise SystemExit(1)
+
+    chunks = args.chunks
+    if chunks == 0:
+        chunks = args.workers if len(videos) == 1 else 1
+    tasks = [task for video in videos for task in split_chunks(video, chunks, args.overlap_seconds)]
+
+    workers = max(1, min(args.workers, len(tasks)))
+    # 每個 worker 分到的執行緒數，避免行程之間互搶 CPU
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    events = []
+    total_frames = 0
+    total_warmup = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(args.model, args.backend, threads, args.fall_class_id, args.snapshots)) as executor:
+        futures = {executor.submit(analyze_file, *task): task for task in tasks}
+        for future in as_completed(futures):
+            video, start_frame, end_frame, _ = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"{video} [{start_frame}:{end_frame}] 分析失敗：{e}")
+                continue
+            events.extend(result["events"])
+            total_frames += result["frames"]
+            total_warmup += result["warmup_frames"]
+            # 這一段實際推論的速度包含暖機幀
+            processed = result["frames"] + result["warmup_frames"]
+            fps = processed / result["seconds"] if result["seconds"] > 0 else 0
+            warmup = f"（另有暖機 {result['warmup_frames']} 幀）" if result["warmup_frames"] else ""
+            print(f"{video} [{start_frame}:{end_frame}]: {result['frames']} 幀{warmup}，{len(result['events'])} 個跌倒事件，{fps:.1f} FPS")
+
+    # 各段的事件依影片與幀號合併排序
+    events.sort(key=lambda event: (event["file"], event["frame"]))
+    writer = EventWriter(args.output)
+    for event in events:
+        writer.write(event)
+    writer.close()
+    total_events = len(events)
+
+    elapsed = time.perf_counter() - start
+    print(f"共 {len(videos)} 部影片、{total_frames} 幀、{total_events} 個跌倒事件")
+    if total_warmup:
+        print(f"分段重疊的暖機幀 {total_warmup} 幀（不計入幀數與整體 FPS）")
+    print(f"總耗時 {elapsed:.1f} 秒，整體 {total_frames / elapsed:.1f} FPS（{workers} 個 worker）")
+    print(f"事件已輸出到 {args.output}")
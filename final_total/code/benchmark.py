@@ -0,0 +1,139 @@
+# benchmark.py
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+import cv2
+import numpy as np
+
+# 與介面上 model_selector 的選項相同
+MODELS = ["YOLOv10", "YOLOv11", "YOLO11N-POSE", "ENSEMBLE", "CASCADE"]
+BACKENDS = ["torch", "onnx", "openvino", "openvino-int8"]
+
+
+def peak_rss_mb():
+    # 行程的最高記憶體用量（MB）
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 單位是 KB，macOS 是 bytes
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / 1024 / 1024
+    except ImportError:
+        return None
+
+
+def synthetic_frames(count, width=1280, height=720, seed=0):
+    # 固定亂數種子產生的合成畫面：雜訊背景加上移動中的直立與橫躺矩形，每次執行結果相同
+    # 逐張產生，不會預先佔用 count 張畫面的記憶體而影響 peak_rss_mb
+    rng = np.random.default_rng(seed)
+    background = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    for i in range(count):
+        frame = background.copy()
+        x = (i * 7) % (width - 300)
+        cv2.rectangle(frame, (x, 200), (x + 120, 560), (40, 40, 200), -1)
+        cv2.rectangle(frame, (width - x - 300, 500), (width - x, 620), (200, 40, 40), -1)
+        yield frame
+
+
+def read_clip(path, max_frames):
+    cap = cv2.VideoCapture(path)
+    while max_frames is None or max_frames > 0:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        yield frame
+        if max_frames is not None:
+            max_frames -= 1
+    cap.release()
+
+
+def run_case(model_name, backend, clips, synthetic_count, max_frames):
+    # 在獨立行程中執行，才能分別量到每個模型 / 後端的最高記憶體用量
+    from fall_detection_logic import FallDetectionLogic
+    from model_registry import model_path_for
+
+    model_path = model_path_for(model_name)
+    start = time.perf_counter()
+    logic = FallDetectionLogic(model_path, "", None, backend=backend, record_clips=False, save_snapshots=False)
+    load_seconds = time.perf_counter() - start
+    logic.verbose = False
+
+    sources = [("synthetic", lambda: synthetic_frames(synthetic_count))] if synthetic_count else []
+    sources += [(clip, lambda clip=clip: read_clip(clip, max_frames)) for clip in clips]
+
+    results = []
+    for source_name, frames in sources:
+        logic.telemetry = type(logic.telemetry)()
+        alerts = 0
+        frame_count = 0
+        start = time.perf_counter()
+        for frame in frames():
+            logic.detect_fall(frame, 0, frame_count / 30.0)
+            alerts += len(logic.last_events)
+            frame_count += 1
+        seconds = time.perf_counter() - start
+        stages = logic.telemetry.snapshot()["stages"]
+        results.append({
+            "model": model_name,
+            "backend": backend,
+            "source": source_name,
+            "frames": frame_count,
+            "seconds": round(seconds, 3),
+            "fps": round(frame_count / seconds, 2) if seconds > 0 else 0.0,
+            "load_seconds": round(load_seconds, 3),
+            "alerts": alerts,
+            "stages_ms": {name: {q: round(stats[q] * 1000, 2) for q in ("p50", "p95", "p99")} for name, stats in stages.items()},
+        })
+    peak = peak_rss_mb()
+    for row in results:
+        row["peak_rss_mb"] = round(peak, 1) if peak is not None else None
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="跌倒偵測熱路徑的基準測試（無 GUI）")
+    parser.add_argument("clips", nargs="*", help="固定的測試影片")
+    parser.add_argument("--models", nargs="+", default=MODELS, choices=MODELS)
+    parser.add_argument("--backends", nargs="+", default=["torch"], choices=BACKENDS)
+    parser.add_argument("--synthetic", type=int, default=200, help="合成畫面張數，0 表示不使用")
+    parser.add_argument("--max-frames", type=int, default=None, help="每部影片最多處理的幀數")
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "results": [],
+    }
+    # 每個組合用新的行程執行，模型與記憶體互不影響
+    context = multiprocessing.get_context("spawn")
+    for model_name in args.models:
+        for backend in args.backends:
+            print(f"測試 {model_name} / {backend} ...")
+            with context.Pool(1) as pool:
+                try:
+                    rows = pool.apply(run_case, (model_name, backend, args.clips, args.synthetic, args.max_frames))
+                except Exception as e:
+                    print(f"{model_name} / {backend} 測試失敗：{e}")
+                    report["results"].append({"model": model_name, "backend": backend, "error": str(e)})
+                    continue
+            for row in rows:
+                print(f"  {row['source']}: {row['fps']} FPS，告警 {row['alerts']}，最高記憶體 {row['peak_rss_mb']} MB")
+            report["results"].extend(rows)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"結果已輸出到 {args.output}")
@@ -0,0 +1,166 @@
+# clip_recorder.py
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+import cv2
+import numpy as np
+from snapshot_writer import prune_files
+
+
+class PendingClip:
+    # 已觸發、還在收集事件後畫面的片段
+    def __init__(self, event_id, frames, remaining):
+        self.event_id = event_id
+        self.frames = frames
+        self.remaining = remaining
+
+
+class ClipRecorder:
+    # 記憶體中的環狀緩衝區，保存最近幾秒縮小且 JPEG 壓縮過的畫面
+    # 跌倒確認時在背景執行緒輸出「事件前 pre_seconds 秒 + 事件後 post_seconds 秒」的影片
+    # 緩衝區最多 max_bytes，同時最多 max_pending 個片段在收集中，記憶體用量有固定上限
+    # 輸出的影片與快照相同，超過 max_age_days 天或超過 max_files 個時刪掉最舊的
+    def __init__(self, save_dir, fps=30, pre_seconds=5, post_seconds=5, scale=0.5, jpeg_quality=70,
+                 max_bytes=32 * 1024 * 1024, max_pending=2, max_files=50, max_age_days=30):
+        self.save_dir = save_dir
+        self.max_files = max_files
+        self.max_age_days = max_age_days
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.scale = scale
+        self.jpeg_quality = jpeg_quality
+        self.max_bytes = max_bytes
+        self.max_pending = max_pending
+        self.set_fps(fps)
+        self.buffer = deque()
+        self.buffer_bytes = 0
+        self.pending = []
+        self.lock = threading.Lock()
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.written = 0
+        self.dropped = 0
+        self.deleted = 0
+        self.closed = False  # close() 之後的畫面與觸發直接忽略
+        if not os.path.exists(self.save_dir):
+            os.makedirs(self.save_dir)
+        self.prune()
+        self.thread = threading.Thread(target=self.worker, daemon=True)
+        self.thread.start()
+
+    def set_fps(self, fps):
+        # CAP_PROP_FPS 讀不到時會回傳 0
+        self.fps = fps if fps and fps > 0 else 30.0
+        self.pre_frames = max(1, int(self.fps * self.pre_seconds))
+        self.post_frames = max(1, int(self.fps * self.post_seconds))
+
+    def push(self, frame):
+        # 每一幀都要呼叫，傳入未畫上標註的原始畫面
+        if self.closed:
+            return
+        if self.scale != 1:
+            frame = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            return
+        data = buffer.tobytes()
+
+        with self.lock:
+            self.buffer.append(data)
+            self.buffer_bytes += len(data)
+            # 超過時間長度或記憶體上限時丟掉最舊的畫面
+            while len(self.buffer) > self.pre_frames or self.buffer_bytes > self.max_bytes:
+                self.buffer_bytes -= len(self.buffer.popleft())
+
+            finished = []
+            for clip in self.pending:
+                clip.frames.append(data)
+                clip.remaining -= 1
+                if clip.remaining <= 0:
+                    finished.append(clip)
+            for clip in finished:
+                self.pending.remove(clip)
+        for clip in finished:
+            self.enqueue(clip)
+
+    def trigger(self, event_id):
+        with self.lock:
+            if self.closed:
+                return
+            if any(clip.event_id == event_id for clip in self.pending):
+                return
+            if len(self.pending) >= self.max_pending:
+                self.dropped += 1
+                print(f"片段收集中的事件過多，略過 {event_id}")
+                return
+            self.pending.append(PendingClip(event_id, list(self.buffer), self.post_frames))
+
+    def enqueue(self, clip, timeout=None):
+        try:
+            if timeout is None:
+                self.queue.put_nowait(clip)
+            else:
+                self.queue.put(clip, timeout=timeout)
+        except queue.Full:
+            self.dropped += 1
+            print(f"影片寫入佇列已滿，略過 {clip.event_id}")
+
+    def worker(self):
+        while True:
+            clip = self.queue.get()
+            if clip is None:
+                self.queue.task_done()
+                break
+            try:
+                self.write_clip(clip)
+            except Exception as e:
+                print(f"影片寫入失敗：{e}")
+            finally:
+                self.queue.task_done()
+
+    def write_clip(self, clip):
+        if not clip.frames:
+            return
+        filename = os.path.join(self.save_dir, f"clip_{clip.event_id}.mp4")
+        writer = None
+        for data in clip.frames:
+            frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if writer is None:
+                height, width = frame.shape[:2]
+                writer = cv2.VideoWriter(filename, cv2.VideoWriter_fourcc(*"mp4v"), self.fps, (width, height))
+            writer.write(frame)
+        writer.release()
+        self.written += 1
+        print(f"已儲存事件影片 {filename}")
+        self.prune()
+
+    def prune(self):
+        self.deleted += prune_files(os.path.join(self.save_dir, "clip_*.mp4"), self.max_files, self.max_age_days)
+
+    def flush(self, timeout=10):
+        # 結束時把還在收集中的片段直接輸出
+        with self.lock:
+            pending, self.pending = self.pending, []
+        for clip in pending:
+            self.enqueue(clip, timeout=timeout)
+        deadline = time.perf_counter() + timeout
+        while self.queue.unfinished_tasks and time.perf_counter() < deadline:
+            time.sleep(0.05)
+
+    def close(self, timeout=10):
+        # 輸出收集中的片段後結束背景執行緒，可重複呼叫
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+        self.flush(timeout)
+        try:
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self.thread.join(timeout=timeout)
+
+    def summary(self):
+        return f"事件影片：寫入 {self.written}，略過 {self.dropped}，刪除 {self.deleted}"
@@ -0,0 +1,47 @@
+# display_sinks.py
+
+import cv2
+import numpy as np
+
+
+def draw_overlays(image, overlays, scale=1.0):
+    # 依標註清單畫在顯示用的影像上，座標為原始畫面座標，依 scale 縮放
+    # ("rect", (x1, y1), (x2, y2), 顏色, 線寬) 或 ("text", 文字, (x, y), 字體大小, 顏色, 線寬)
+    for item in overlays:
+        if item[0] == "rect":
+            _, (x1, y1), (x2, y2), color, thickness = item
+            cv2.rectangle(image, (int(x1 * scale), int(y1 * scale)), (int(x2 * scale), int(y2 * scale)), color, thickness)
+        elif item[0] == "text":
+            _, text, (x, y), font_scale, color, thickness = item
+            cv2.putText(image, text, (int(x * scale), int(y * scale)), cv2.FONT_HERSHEY_SIMPLEX, font_scale, color, thickness)
+
+
+class OpenCVWindowSink:
+    # 用 cv2.imshow 顯示偵測畫面；不需要顯示時（伺服器、背景服務）不傳入任何 sink 即可
+    # 縮放結果寫進預先配置的 buffer，標註只畫在 buffer 上，不會改到原始畫面
+    def __init__(self, window_name="Fall Detection", scale_percent=93):
+        self.window_name = window_name
+        self.scale_percent = scale_percent # 放大比例，這裡是93%
+        self.buffer = None
+
+    def render(self, frame, overlays=()):
+        # 等比例放大顯示視窗
+        width = int(frame.shape[1] * self.scale_percent / 100)
+        height = int(frame.shape[0] * self.scale_percent / 100)
+        if self.buffer is None or self.buffer.shape != (height, width) + frame.shape[2:]:
+            self.buffer = np.empty((height, width) + frame.shape[2:], dtype=frame.dtype)
+        # 調整影像大小，直接寫入 buffer
+        cv2.resize(frame, (width, height), dst=self.buffer, interpolation=cv2.INTER_LINEAR)
+        draw_overlays(self.buffer, overlays, self.scale_percent / 100)
+        return self.buffer
+
+    def show(self, frame, overlays=()):
+        # 回傳 False 代表使用者按下 ESC 或關閉視窗
+        # 顯示等比放大的影像
+        cv2.imshow(self.window_name, self.render(frame, overlays))
+        if cv2.waitKey(1) == 27 or cv2.getWindowProperty(self.window_name, cv2.WND_PROP_VISIBLE) < 1:
+            return False
+        return True
+
+    def close(self):
+        cv2.destroyAllWindows()
@@ -0,0 +1,175 @@
+# ensemble.py
+
+import cv2
+import numpy as np
+from fall_confirmer import box_iou
+from result_decoder import decode_result
+
+
+def letterbox(image, imgsz=640, color=(114, 114, 114)):
+    # 等比例縮放後補邊成 imgsz x imgsz（與 ultralytics 的 LetterBox 相同），回傳影像、縮放比例與左上補邊
+    height, width = image.shape[:2]
+    scale = min(imgsz / height, imgsz / width)
+    new_width, new_height = int(round(width * scale)), int(round(height * scale))
+    pad_x, pad_y = (imgsz - new_width) // 2, (imgsz - new_height) // 2
+    if (new_width, new_height) != (width, height):
+        image = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+    image = cv2.copyMakeBorder(image, pad_y, imgsz - new_height - pad_y, pad_x, imgsz - new_width - pad_x,
+                               cv2.BORDER_CONSTANT, value=color)
+    return image, scale, pad_x, pad_y
+
+
+def to_source_coordinates(result, scale, pad_x, pad_y, shape):
+    # letterbox 影像上的座標換回原始影像
+    result.transform(1 / scale, -pad_x / scale, -pad_y / scale)
+    height, width = shape[:2]
+    result.boxes[:, [0, 2]] = result.boxes[:, [0, 2]].clip(0, width)
+    result.boxes[:, [1, 3]] = result.boxes[:, [1, 3]].clip(0, height)
+    return result
+
+
+def attach_poses(result, poses, iou_threshold=0.3):
+    # 依 IoU 把姿勢模型偵測到的人對應到框模型的框，沒對到的關鍵點全為 0
+    keypoints = np.zeros((len(result), 17, 2), dtype=np.float32)
+    matched = np.zeros(len(result), dtype=bool)
+    if len(result) and poses is not None and len(poses) and poses.keypoints is not None:
+        iou = box_iou(result.boxes, poses.boxes)
+        best = iou.argmax(axis=1)
+        matched = iou[np.arange(len(result)), best] >= iou_threshold
+        keypoints[matched] = poses.keypoints[best[matched]]
+    result.keypoints = keypoints
+    result.pose_matched = matched
+    return result
+
+
+def fuse_decisions(box_flags, pose_flags, pose_matched, mode="and"):
+    # and：框模型判定跌倒且姿勢也符合才算，沒對到姿勢的人只看框模型（減少誤報）
+    # or：框模型或姿勢任一判定跌倒就算（減少漏報）
+    if mode == "or":
+        return box_flags | (pose_flags & pose_matched)
+    return box_flags & (pose_flags | ~pose_matched)
+
+
+class EnsembleDetector:
+    # 框模型（YOLOv10/YOLO11）與姿勢模型（YOLO11N-POSE）共用同一張 letterbox 後的輸入
+    # 只有框模型標出跌倒候選時才執行姿勢模型；predict 回傳 result_decoder.DecodedResult 列表
+    # 跌倒類別由 predict 的 fall_class_id 指定，沒給時使用建構時的 fall_class_id
+    def __init__(self, detector, pose_model, imgsz=640, fall_class_id=0, fusion="and", iou_threshold=0.3):
+        if fusion not in ("and", "or"):
+            raise ValueError(f"不支援的融合方式：{fusion}")
+        self.detector = detector
+        self.pose_model = pose_model
+        self.imgsz = imgsz
+        self.fall_class_id = fall_class_id
+        self.fusion = fusion
+        self.iou_threshold = iou_threshold
+        self.pose_runs = 0  # 實際執行姿勢模型的次數
+
+    def predict(self, source, conf=0.5, verbose=False, imgsz=None, fall_class_id=None, **kwargs):
+        # source 可以是單張影像或影像列表（多路攝影機批次推論）
+        images = source if isinstance(source, list) else [source]
+        imgsz = imgsz or self.imgsz
+        fall_class_id = self.fall_class_id if fall_class_id is None else fall_class_id
+        # 縮放只做一次，兩個模型都用同一張影像，ultralytics 不會再縮放
+        letterboxed = [letterbox(image, imgsz) for image in images]
+        inputs = [item[0] for item in letterboxed]
+        detections = [decode_result(result) for result in
+                      self.detector.predict(inputs, conf=conf, imgsz=imgsz, verbose=verbose, **kwargs)]
+
+        # 只把有跌倒候選的影像送進姿勢模型
+        candidates = [i for i, result in enumerate(detections) if result.class_mask(fall_class_id).any()]
+        poses = [None] * len(images)
+        if candidates:
+            self.pose_runs += 1
+            pose_results = self.pose_model.predict([inputs[i] for i in candidates], conf=conf, imgsz=imgsz,
+                                                   verbose=verbose, **kwargs)
+            for i, result in zip(candidates, pose_results):
+                poses[i] = decode_result(result)
+
+        results = []
+        for image, (_, scale, pad_x, pad_y), detected, pose in zip(images, letterboxed, detections, poses):
+            # 在 letterbox 座標上配對後再一起換回原始影像座標
+            attach_poses(detected, pose, self.iou_threshold)
+            results.append(to_source_coordinates(detected, scale, pad_x, pad_y, image.shape))
+        return results
+
+
+class CascadeDetector:
+    # 串接模式：框模型先以低解析度跑整張畫面，再把候選人物的框裁切放大，批次送進姿勢模型
+    # 遠處的人在裁切後變大，關鍵點較準；大畫面時也比整張畫面跑姿勢模型省計算
+    def __init__(self, detector, pose_model, detector_imgsz=320, crop_size=256, fall_class_id=0, fusion="or",
+                 padding=0.15, max_crops=8, iou_threshold=0.3):
+        if fusion not in ("and", "or"):
+            raise ValueError(f"不支援的融合方式：{fusion}")
+        self.detector = detector
+        self.pose_model = pose_model
+        self.detector_imgsz = detector_imgsz
+        self.crop_size = crop_size
+        self.fall_class_id = fall_class_id
+        self.fusion = fusion
+        self.padding = padding  # 裁切時框往外擴的比例，保留四肢
+        self.max_crops = max_crops  # 每張影像最多裁切幾個人（跌倒類別優先，再依信心分數）
+        self.iou_threshold = iou_threshold
+        self.pose_runs = 0
+
+    def detector_size(self, imgsz=None):
+        # 外部給的 imgsz（例如自動調整解析度）以 640 為基準等比例套用到低解析度的框模型，不直接取代
+        if not imgsz:
+            return self.detector_imgsz
+        return max(32, int(round(self.detector_imgsz * imgsz / 640 / 32)) * 32)
+
+    def crop_regions(self, result, shape, fall_class_id):
+        # 每個候選框往外擴 padding 後的裁切範圍（整數座標）
+        # 超過 max_crops 時先保留跌倒類別的框，同類別再依信心分數，跌倒候選不會因為人多而沒有姿勢
+        height, width = shape[:2]
+        order = np.lexsort((-result.conf, ~result.class_mask(fall_class_id)))[:self.max_crops]
+        boxes = result.boxes[order]
+        pad_x = (boxes[:, 2] - boxes[:, 0]) * self.padding
+        pad_y = (boxes[:, 3] - boxes[:, 1]) * self.padding
+        regions = np.stack([boxes[:, 0] - pad_x, boxes[:, 1] - pad_y, boxes[:, 2] + pad_x, boxes[:, 3] + pad_y], axis=1)
+        regions[:, [0, 2]] = regions[:, [0, 2]].clip(0, width)
+        regions[:, [1, 3]] = regions[:, [1, 3]].clip(0, height)
+        return order, regions.astype(int)
+
+    def predict(self, source, conf=0.5, verbose=False, imgsz=None, fall_class_id=None, **kwargs):
+        images = source if isinstance(source, list) else [source]
+        fall_class_id = self.fall_class_id if fall_class_id is None else fall_class_id
+        detections = [decode_result(result) for result in
+                      self.detector.predict(images, conf=conf, imgsz=self.detector_size(imgsz), verbose=verbose,
+                                            **kwargs)]
+
+        # 所有影像的候選人物合併成一個批次
+        crops = []  # (影像編號, 框編號, 裁切左上角, 縮放比例, 補邊)
+        inputs = []
+        for index, (image, result) in enumerate(zip(images, detections)):
+            if not len(result):
+                continue
+            order, regions = self.crop_regions(result, image.shape, fall_class_id)
+            for box_index, (x1, y1, x2, y2) in zip(order, regions):
+                if x2 - x1 < 2 or y2 - y1 < 2:
+                    continue
+                crop, scale, pad_x, pad_y = letterbox(image[y1:y2, x1:x2], self.crop_size)
+                inputs.append(crop)
+                crops.append((index, box_index, x1, y1, scale, pad_x, pad_y))
+
+        keypoints = [np.zeros((len(result), 17, 2), dtype=np.float32) for result in detections]
+        matched = [np.zeros(len(result), dtype=bool) for result in detections]
+        if inputs:
+            self.pose_runs += 1
+            pose_results = self.pose_model.predict(inputs, conf=conf, imgsz=self.crop_size, verbose=verbose, **kwargs)
+            for (index, box_index, x1, y1, scale, pad_x, pad_y), pose in zip(crops, pose_results):
+                pose = decode_result(pose)
+                if not len(pose) or pose.keypoints is None:
+                    continue
+                # 裁切座標換回整張影像，裁切內可能有多人，取與候選框最重疊的那一個
+                pose.transform(1 / scale, x1 - pad_x / scale, y1 - pad_y / scale)
+                iou = box_iou(detections[index].boxes[box_index], pose.boxes)[0]
+                best = int(iou.argmax())
+                if iou[best] >= self.iou_threshold:
+                    keypoints[index][box_index] = pose.keypoints[best]
+                    matched[index][box_index] = True
+
+        for result, points, pose_matched in zip(detections, keypoints, matched):
+            result.keypoints = points
+            result.pose_matched = pose_matched
+        return detections
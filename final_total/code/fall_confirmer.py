@@ -0,0 +1,154 @@
+# fall_confirmer.py
+
+import itertools
+import os
+import time
+from collections import deque
+import numpy as np
+
+# 事件 ID = 啟動時間-行程編號-流水號，多路攝影機或多個 worker 行程同時執行也不會重複
+EVENT_SESSION = f"{time.strftime('%Y%m%d%H%M%S')}-{os.getpid()}"
+EVENT_COUNTER = itertools.count(1)
+
+
+def box_iou(boxes_a, boxes_b):
+    # 計算兩組邊界框 (x1, y1, x2, y2) 兩兩之間的 IoU，回傳 (N, M) 陣列
+    boxes_a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+    x1 = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    y1 = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    x2 = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+    y2 = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-6), 0.0)
+
+
+def greedy_match(iou, iou_threshold):
+    # 由 IoU 最大的配對開始貪婪配對，每一列與每一欄最多配對一次，回傳 [(列, 欄)]
+    pairs = []
+    rows, cols = set(), set()
+    for flat in np.argsort(-iou, axis=None):
+        i, j = np.unravel_index(flat, iou.shape)
+        if iou[i, j] < iou_threshold:
+            break
+        if i not in rows and j not in cols:
+            rows.add(i)
+            cols.add(j)
+            pairs.append((int(i), int(j)))
+    return pairs
+
+
+class IoUMatcher:
+    # 沒有追蹤器 ID 時，用前後幀邊界框的 IoU 配對同一個人
+    def __init__(self, iou_threshold=0.3, max_missing=15):
+        self.iou_threshold = iou_threshold
+        self.max_missing = max_missing
+        self.tracks = {}  # track_id -> [box, 連續沒出現的次數]
+        self.next_id = 1
+
+    def assign(self, boxes):
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        track_ids = list(self.tracks.keys())
+        ids = [None] * len(boxes)
+        if track_ids and len(boxes):
+            iou = box_iou(boxes, [self.tracks[t][0] for t in track_ids])
+            for i, j in greedy_match(iou, self.iou_threshold):
+                ids[i] = track_ids[j]
+
+        for i, box in enumerate(boxes):
+            if ids[i] is None:
+                ids[i] = self.next_id
+                self.next_id += 1
+            self.tracks[ids[i]] = [box, 0]
+
+        for track_id in list(self.tracks.keys()):
+            if track_id not in ids:
+                self.tracks[track_id][1] += 1
+                if self.tracks[track_id][1] > self.max_missing:
+                    del self.tracks[track_id]
+        return ids
+
+
+class FallTrack:
+    # 單一個人的狀態：最近 M 次推論的特徵與跌倒狀態
+    def __init__(self, track_id, window):
+        self.track_id = track_id
+        # (時間, 中心 y, 寬, 高, 是否判定跌倒)
+        self.history = deque(maxlen=window)
+        self.confirmed = False
+        self.newly_confirmed = False
+        self.event_id = None
+        self.missing = 0
+        self.box = None
+
+    def add(self, timestamp, box, is_fall):
+        x1, y1, x2, y2 = [float(v) for v in box]
+        self.box = box
+        self.history.append((timestamp, (y1 + y2) / 2, x2 - x1, y2 - y1, bool(is_fall)))
+        self.missing = 0
+
+    def fall_hits(self):
+        return sum(1 for item in self.history if item[4])
+
+    def vertical_velocity(self):
+        # 中心點垂直速度，以「身高 / 秒」為單位，正值代表往下
+        if len(self.history) < 2:
+            return 0.0
+        t0, y0, _, h0, _ = self.history[0]
+        t1, y1, _, h1, _ = self.history[-1]
+        height = max((h0 + h1) / 2, 1.0)
+        if t1 <= t0:
+            return 0.0
+        return (y1 - y0) / height / (t1 - t0)
+
+    def aspect_ratio(self):
+        if not self.history:
+            return 0.0
+        _, _, width, height, _ = self.history[-1]
+        return width / max(height, 1.0)
+
+
+class FallConfirmer:
+    # 時間上的跌倒確認：每個人最近 M 次推論中有 K 次判定跌倒才確認
+    # 確認後要連續 M 次都沒有判定跌倒才解除
+    def __init__(self, k=3, m=5, max_missing=15, matcher=None):
+        self.k = k
+        self.m = m
+        self.max_missing = max_missing
+        self.matcher = matcher if matcher is not None else IoUMatcher(max_missing=max_missing)
+        self.tracks = {}
+
+    def update(self, boxes, fall_flags, track_ids=None, timestamp=None):
+        # boxes: (N, 4)，fall_flags: 長度 N，track_ids: 追蹤器給的 ID（可為 None）
+        # 回傳與 boxes 對應的 FallTrack 列表
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        if track_ids is None:
+            track_ids = self.matcher.assign(boxes)
+
+        states = []
+        for box, is_fall, track_id in zip(boxes, fall_flags, track_ids):
+            state = self.tracks.get(track_id)
+            if state is None:
+                state = self.tracks[track_id] = FallTrack(track_id, self.m)
+            state.add(timestamp, box, is_fall)
+            hits = state.fall_hits()
+            state.newly_confirmed = False
+            if not state.confirmed and hits >= self.k:
+                state.confirmed = True
+                state.newly_confirmed = True
+                state.event_id = f"{EVENT_SESSION}-{next(EVENT_COUNTER)}"
+            elif state.confirmed and hits == 0:
+                state.confirmed = False
+            states.append(state)
+
+        seen = set(track_ids)
+        for track_id in list(self.tracks.keys()):
+            if track_id not in seen:
+                self.tracks[track_id].missing += 1
+                if self.tracks[track_id].missing > self.max_missing:
+                    del self.tracks[track_id]
+        return states
@@ -1,186 +1,381 @@
-import cv2
-import os
-from datetime import datetime
-from ultralytics import YOLO
-import requests
-import math
-
-class FallDetectionLogic:
-    def __init__(self, model_path, line_token, window):
-        self.model = YOLO(model_path)
-        self.model_name = os.path.basename(model_path).split("best")[0]
-        self.save_dir = "detected_falls"
-        if not os.path.exists(self.save_dir):
-            os.makedirs(self.save_dir)
-        self.line_token = line_token
-        self.last_sent_time = None  
-        self.window = window
-
-    def run(self, cap, fall_class_id=0, is_video=False):
-        if not cap.isOpened():
-            print("無法開啟攝影機或影片")
-            return
-            
-        frame_count = 0
-            
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            frame_count += 1                
-            if is_video or frame_count % 1 == 0:
-                self.detect_fall(frame, fall_class_id)
-            '''
-            cv2.imshow("Fall Detection", frame)
-            if cv2.waitKey(1) == 27 or cv2.getWindowProperty("Fall Detection", cv2.WND_PROP_VISIBLE) < 1:
-                break
-            '''     
-            # 等比例放大顯示視窗
-            scale_percent = 93 # 放大比例，這裡是130%
-            width = int(frame.shape[1] * scale_percent / 100) 
-            height = int(frame.shape[0] * scale_percent / 100) 
-            dim = (width, height) 
-            # 調整影像大小 
-            resized_frame = cv2.resize(frame, dim, interpolation=cv2.INTER_LINEAR) 
-            # 顯示等比放大的影像 
-            cv2.imshow("Fall Detection", resized_frame) 
-            if cv2.waitKey(1) == 27 or cv2.getWindowProperty("Fall Detection", cv2.WND_PROP_VISIBLE) < 1: break
-
-        cap.release()
-        cv2.destroyAllWindows()
-        self.window.show()
-    
-    def detect_fall(self, frame, fall_class_id):
-        if "pose" in self.model_name:
-            self.detect_fall_with_pose(frame, fall_class_id)
-        else:
-            self.detect_fall_with_bounding_box(frame, fall_class_id)
-
-    def detect_fall_with_bounding_box(self, frame, fall_class_id):
-        results = self.model.predict(frame, conf=0.5)
-        for result in results:
-            for box in result.boxes:
-                cls_id = int(box.cls[0])
-                if cls_id == fall_class_id:
-                    x1, y1, x2, y2 = map(int, box.xyxy[0])
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 0, 255), 2)
-                    cv2.putText(frame, "Fall Detected", (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-                    current_time = datetime.now()
-                    timestamp = current_time.strftime("%Y%m%d_%H%M%S")  
-                    filename = os.path.join(self.save_dir, f"fall_{timestamp}.jpg")
-                    cv2.imwrite(filename, frame)
-                    if self.last_sent_time is None or (current_time - self.last_sent_time).seconds >= 3:
-                        self.send_to_line_notify(filename, current_time)
-                        self.last_sent_time = current_time
-
-    def detect_fall_with_pose(self, frame, fall_class_id):
-        results = self.model.predict(frame, conf=0.5)
-        for result in results:
-            if result.keypoints:
-                keypoints_tensor = result.keypoints.xy.cpu()
-                keypoints = keypoints_tensor.numpy()
-                if keypoints.shape[0] > 0:  # 有偵測測到人，keypoints.shape[0]取得人數
-                    self.draw_predictions(frame, result)
-                    for i, person_keypoints in enumerate(keypoints): # 遍歷每個人的關鍵點 , i表第i個人
-                        # 確保 result.boxes 有足夠的元素 
-                        if len(result.boxes) > i:
-                            # 獲取對應的邊界框 
-                            bbox = result.boxes[i].xyxy[0].cpu().numpy().astype(int) 
-                            if self.is_fall_pose(person_keypoints, bbox):  # person_keypoints一個人共 17 個關鍵點座標
-                                x, y = int(person_keypoints[0][0]), int(person_keypoints[0][1])
-                                cv2.putText(frame, "Fall Detected (Pose)", (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-                                current_time = datetime.now()
-                                timestamp = current_time.strftime("%Y%m%d_%H%M%S")
-                                filename = os.path.join(self.save_dir, f"fall_{timestamp}.jpg")
-                                cv2.imwrite(filename, frame)
-                                if self.last_sent_time is None or (current_time - self.last_sent_time).seconds >= 3:
-                                    self.send_to_line_notify(filename, current_time)
-                                    self.last_sent_time = current_time
-
-    def draw_predictions(self, frame, result):
-        # 繪製預測框
-        for box in result.boxes:
-            x1, y1, x2, y2 = map(int, box.xyxy[0])
-            conf = box.conf[0]
-            cls = int(box.cls[0])
-            label = f"{cls} {conf:.2f}"
-            cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-            cv2.putText(frame, label, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 0), 2)
-
-        '''
-        # 繪製關鍵點並標號，顯示所有人
-        for person_keypoints in result.keypoints.xy:
-            for i, keypoint in enumerate(person_keypoints):
-                x, y = int(keypoint[0]), int(keypoint[1])
-                if x == 0 and y == 0:
-                    cv2.circle(frame, (x, y), 5, (255, 0, 0), -1)
-                    cv2.putText(frame, f"KP{i}", (x + 5, y + 5), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-                else:
-                    cv2.circle(frame, (x, y), 5, (0, 0, 255), -1)
-                    cv2.putText(frame, f"KP{i}", (x + 5, y + 5), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-        '''
-        
-
-
-    def is_fall_pose(self, keypoints, bbox):
-        if len(keypoints) == 17:
-            head_x, head_y = keypoints[0]
-            left_shoulder_x, left_shoulder_y = keypoints[5] 
-            right_shoulder_x, right_shoulder_y = keypoints[6] 
-            left_hip_x, left_hip_y = keypoints[11]
-            right_hip_x, right_hip_y = keypoints[12]
-            left_knee_x, left_knee_y = keypoints[13]
-            right_knee_x, right_knee_y = keypoints[14]
-
-            valid_keypoints_mask = [0] * 17  # 初始化大小為 17 的陣列，全為 0
-
-            # 確認所有 17 個關鍵點是否有效
-            for i, (x, y) in enumerate(keypoints):
-                if x == 0 and y == 0:
-                    valid_keypoints_mask[i] = 0  # 將無效的關鍵點位置設為 0
-                else:
-                    valid_keypoints_mask[i] = 1
-
-            # 身體角度
-            if valid_keypoints_mask[5] and valid_keypoints_mask[6] and valid_keypoints_mask[11] and valid_keypoints_mask[12]:
-                center_up_x = (left_shoulder_x + right_shoulder_x) / 2 
-                center_up_y = (left_shoulder_y + right_shoulder_y) / 2 
-                center_down_x = (left_hip_x + right_hip_x) / 2 
-                center_down_y = (left_hip_y + right_hip_y) / 2 
-                dx = center_down_x - center_up_x 
-                dy = center_down_y - center_up_y 
-                angle = abs(math.degrees(math.atan2(dy, dx))) 
-                # 計算中心線與地平線的夾角 
-                if angle < 50 or angle > 130: 
-                    return True
-            
-            # 如果有效關鍵點數量不足 13，則返回 False
-            if sum(valid_keypoints_mask) >= 13:
-                # 預測框的寬高比條件
-                x1, y1, x2, y2 = bbox  # 獲取邊界框的座標
-                width = x2 - x1
-                height = y2 - y1
-                if width / height > 5 / 3:
-                    return True
-
-            # 頭和臀部同時低於膝蓋
-            if valid_keypoints_mask[0] and valid_keypoints_mask[11] and valid_keypoints_mask[13]:
-                if head_y >= left_knee_y and left_hip_y >= left_knee_y:
-                    return True
-            if valid_keypoints_mask[0] and valid_keypoints_mask[12] and valid_keypoints_mask[14]:
-                if head_y >= right_knee_y and right_hip_y >= right_knee_y:
-                    return True
-                
-        return False
-
-    def send_to_line_notify(self, image_path, time):
-        url = 'https://notify-api.line.me/api/notify'
-        headers = {'Authorization': f'Bearer {self.line_token}'}
-        data = {'message': f"{time.year}年{time.month}月{time.day}日 {time.hour:02}:{time.minute:02}:{time.second:02}"}
-        files = {'imageFile': open(image_path, 'rb')}
-        response = requests.post(url, headers=headers, data=data, files=files)
-        if response.status_code == 200:
-            print("圖片已成功傳送到 LINE Notify")
-        else:
-            print(f"圖片傳送失敗，狀態碼：{response.status_code}")
+import cv2
+import os
+from datetime import datetime
+import threading
+import time
+import numpy as np
+from frame_pipeline import FramePipeline
+from model_registry import get_model, COMBINED_MODELS
+from inference_scheduler import AdaptiveScheduler, ImgszController
+from motion_detector import MotionDetector, MotionGate
+from alert_dispatcher import AlertDispatcher
+from pose_rules import is_fall_pose, is_fall_pose_batch
+from result_decoder import decode_results
+from ensemble import fuse_decisions
+from tracker import BoxTracker
+from fall_confirmer import FallConfirmer
+from snapshot_writer import SnapshotWriter
+from clip_recorder import ClipRecorder
+from telemetry import Telemetry
+
+class FallDetectionLogic:
+    def __init__(self, model_path, line_token, window=None, model=None, save_dir="detected_falls", motion_gate=False,
+                 record_clips=True, backend="torch", threads=None, save_snapshots=True, roi=None, imgsz=None,
+                 tracker=None):
+        # 多路攝影機時由外部傳入共用的模型，否則從快取取得，不會每次重新載入權重
+        self.model = model if model is not None else get_model(model_path, backend, threads)
+        self.model_name = os.path.basename(model_path).split("best")[0]
+        self.save_dir = save_dir
+        # 各階段耗時與 FPS 統計
+        self.telemetry = Telemetry()
+        self.show_telemetry = False  # 是否在畫面上顯示統計
+        # 快照在背景執行緒寫檔，同一事件節流並限制資料夾大小
+        self.snapshot_writer = SnapshotWriter(self.save_dir, telemetry=self.telemetry) if save_snapshots else None
+        # 事件前後的影片片段
+        self.clip_recorder = ClipRecorder(self.save_dir) if record_clips else None
+        self.line_token = line_token
+        self.last_sent_time = None  
+        # 告警改由背景執行緒傳送，沒有 Token 就不傳
+        self.alert_dispatcher = AlertDispatcher(line_token, telemetry=self.telemetry) if line_token else None
+        self.window = window
+        self.motion_detector = MotionDetector()
+        # 動態閘門：畫面靜止時略過推論
+        self.motion_gate = MotionGate(self.motion_detector) if motion_gate else None
+        # 監控區域（roi.RegionOfInterest），None 表示整個畫面都偵測
+        self.roi = roi
+        # 推論解析度：None 使用模型預設，數字為固定大小，"auto" 依負載自動調整
+        self.imgsz = None
+        self.imgsz_controller = None
+        self.set_imgsz(imgsz, backend)
+        # 追蹤：None 不追蹤（跌倒確認以 IoU 配對），"iou" 內建的 IoU + 卡爾曼追蹤器，"bytetrack" 使用 model.track
+        self.tracker_mode = tracker
+        if tracker == "bytetrack" and not hasattr(self.model, "track"):
+            print("組合模式不支援 model.track，改用內建追蹤器")
+            self.tracker_mode = "iou"
+        self.tracker = BoxTracker() if self.tracker_mode == "iou" else None
+        self.last_person_count = 0  # 上一次推論偵測到的人數
+        # 每個人最近 5 次推論中有 3 次判定跌倒才發出告警
+        self.fall_confirmer = FallConfirmer(k=3, m=5)
+        self.last_events = []
+        self.overlays = []  # 最近一次推論的標註，沒有推論的幀沿用
+        self.verbose = True  # ultralytics 每幀是否印出推論結果
+        self.stop_event = threading.Event()
+
+    def run(self, cap, fall_class_id=0, is_video=False, display=None):
+        # display 為顯示用的 sink（例如 OpenCVWindowSink），None 表示不顯示（headless）
+        if not cap.isOpened():
+            print("無法開啟攝影機或影片")
+            return
+            
+        frame_count = 0
+        self.stop_event.clear()
+        # 攝影機依場景調整推論頻率，影片則每幀推論
+        scheduler = None if is_video else AdaptiveScheduler(cap.get(cv2.CAP_PROP_FPS))
+        self.set_source_fps(cap.get(cv2.CAP_PROP_FPS))
+            
+        while cap.isOpened() and not self.stop_event.is_set():
+            start = time.perf_counter()
+            ret, frame = cap.read()
+            if not ret:
+                break
+            self.telemetry.record("capture", time.perf_counter() - start)
+            self.telemetry.tick("frames_captured")
+
+            frame_count += 1                
+            self.record_frame(frame)
+            self.detect_fall_scheduled(frame, frame_count, fall_class_id, scheduler)
+            '''
+            cv2.imshow("Fall Detection", frame)
+            if cv2.waitKey(1) == 27 or cv2.getWindowProperty("Fall Detection", cv2.WND_PROP_VISIBLE) < 1:
+                break
+            '''     
+            if display is not None:
+                with self.telemetry.stage("display"):
+                    keep_running = display.show(frame, self.with_telemetry_overlay(self.overlays))
+                if not keep_running:
+                    break
+            self.telemetry.record("end_to_end", time.perf_counter() - start)
+            self.telemetry.tick("frames_processed")
+
+        self.finish(cap, display)
+
+    def run_pipelined(self, cap, fall_class_id=0, is_video=False, display=None):
+        # 擷取、推論、顯示分開在不同執行緒，延遲不會因推論太慢而累積
+        if not cap.isOpened():
+            print("無法開啟攝影機或影片")
+            return
+
+        self.stop_event.clear()
+        self.set_source_fps(cap.get(cv2.CAP_PROP_FPS))
+        FramePipeline(self, cap, fall_class_id, is_video, display=display).run()
+        self.finish(cap, display)
+
+    def finish(self, cap, display):
+        cap.release()
+        if display is not None:
+            display.close()
+        self.close()
+        print(self.telemetry.summary())
+        # 由 GUI 啟動時重新顯示主視窗
+        if self.window is not None:
+            self.window.show()
+
+    def stop(self):
+        # 從其他執行緒或訊號處理函式要求停止偵測
+        self.stop_event.set()
+
+    def enable_metrics(self, port=None, path=None, interval=5.0):
+        # 對外提供統計：本機 HTTP（/metrics）或定期輸出 Prometheus 格式的文字檔
+        if port is not None:
+            self.telemetry.start_http_server(port)
+        if path is not None:
+            self.telemetry.start_file_export(path, interval)
+
+    def with_telemetry_overlay(self, overlays):
+        if not self.show_telemetry:
+            return overlays
+        return list(overlays) + self.telemetry.overlay_items()
+
+    def set_source_fps(self, fps):
+        self.telemetry.set_source_fps(fps)
+        if self.clip_recorder is not None:
+            self.clip_recorder.set_fps(fps)
+
+    def record_frame(self, frame):
+        # 每一幀（包含沒有推論的幀）都放進事件影片的緩衝區，需在畫上標註之前呼叫
+        if self.clip_recorder is not None:
+            self.clip_recorder.push(frame)
+
+    def detect_fall_scheduled(self, frame, frame_index, fall_class_id, scheduler):
+        # 依排程決定這一幀要不要推論，沒有排程器就每幀推論
+        if scheduler is not None and not scheduler.should_infer(frame_index, self.motion_detector.score(frame)):
+            self.telemetry.increment("frames_skipped")
+            self.predict_tracks()
+            return False
+        start = time.perf_counter()
+        if not self.detect_fall(frame, fall_class_id):
+            self.predict_tracks()
+            return False
+        elapsed = time.perf_counter() - start
+        self.telemetry.record("inference", elapsed)
+        if scheduler is not None:
+            scheduler.update(frame_index, self.last_person_count > 0, elapsed)
+        return True
+
+    def detect_fall(self, frame, fall_class_id, timestamp=None):
+        # 被動態閘門略過時回傳 False；timestamp 為影片時間（秒），離線分析時使用
+        self.last_events = []
+        if self.motion_gate is not None and not self.motion_gate.allow(frame, self.last_person_count > 0):
+            self.telemetry.increment("frames_gated")
+            return False
+        image = self.model_input(frame)
+        start = time.perf_counter()
+        with self.telemetry.stage("predict"):
+            if self.tracker_mode == "bytetrack":
+                # ultralytics 的 ByteTrack，persist 保留前一幀的追蹤狀態
+                results = self.model.track(image, persist=True, tracker="bytetrack.yaml", conf=0.5,
+                                           verbose=self.verbose, **self.predict_options())
+            else:
+                results = self.model.predict(image, conf=0.5, verbose=self.verbose, **self.predict_options(fall_class_id))
+        self.update_imgsz(time.perf_counter() - start)
+        self.handle_results(frame, results, fall_class_id, timestamp)
+        self.telemetry.increment("frames_inferred")
+        return True
+
+    def predict_tracks(self):
+        # 沒有推論的幀用追蹤器預測的位置更新標註，畫面上的框跟著人移動
+        if self.tracker is None or not self.tracker.tracks:
+            return
+        self.overlays = []
+        for track_id, box in self.tracker.predict():
+            x1, y1, x2, y2 = map(int, box)
+            state = self.fall_confirmer.tracks.get(track_id)
+            if state is not None and state.confirmed:
+                self.overlays.append(("rect", (x1, y1), (x2, y2), (0, 0, 255), 2))
+                self.overlays.append(("text", "Fall Detected", (x1, y1 - 10), 1, (0, 0, 255), 2))
+            else:
+                self.overlays.append(("rect", (x1, y1), (x2, y2), (0, 255, 0), 2))
+                self.overlays.append(("text", f"ID {track_id}", (x1, y1 - 10), 0.5, (255, 0, 0), 2))
+
+    def set_imgsz(self, imgsz, backend="torch"):
+        self.imgsz_controller = None
+        if imgsz == "auto":
+            if backend != "torch":
+                print("自動調整解析度只支援 torch 後端，匯出的模型使用預設解析度")
+                self.imgsz = None
+                return
+            self.imgsz_controller = ImgszController()
+            self.imgsz = self.imgsz_controller.imgsz
+        else:
+            self.imgsz = int(imgsz) if imgsz else None
+
+    def predict_options(self, fall_class_id=None):
+        options = {"imgsz": self.imgsz} if self.imgsz else {}
+        # 組合模式依呼叫端的跌倒類別決定哪些偵測要送進姿勢模型
+        if fall_class_id is not None and self.model_name in COMBINED_MODELS.values():
+            options["fall_class_id"] = fall_class_id
+        return options
+
+    def update_imgsz(self, inference_time):
+        # 自動模式下依達成 FPS 與推論時間決定下一次的解析度
+        if self.imgsz_controller is not None:
+            self.imgsz = self.imgsz_controller.update(inference_time, self.telemetry.rate("frames_processed"),
+                                                      self.telemetry.source_fps)
+
+    def model_input(self, frame):
+        # 有設定監控區域時只把區域內的影像送進模型
+        if self.roi is None:
+            return frame
+        with self.telemetry.stage("roi"):
+            return self.roi.prepare(frame)
+
+    def restore_results(self, results, frame):
+        # 偵測結果換回整張畫面的座標，區域外的偵測不會進入跌倒判斷，也不會存檔或告警
+        if self.roi is None:
+            return results
+        with self.telemetry.stage("roi"):
+            return self.roi.map_results(results, frame)
+
+    def handle_results(self, frame, results, fall_class_id, timestamp=None):
+        # 批次推論時由外部傳入該幀的結果
+        # 每幀把結果一次轉成 NumPy，之後的規則與繪圖都不再逐框讀取 tensor
+        with self.telemetry.stage("decode"):
+            decoded = decode_results(results)
+        decoded = self.restore_results(decoded, frame)
+        if self.tracker is not None:
+            with self.telemetry.stage("track"):
+                for result in decoded:
+                    result.track_ids = self.tracker.update(result.boxes)
+        self.last_person_count = sum(len(result) for result in decoded)
+        if self.tracker_mode == "bytetrack":
+            # ByteTrack 還沒有啟用的追蹤（例如新的人第一次出現）時回傳沒有 ID 的框
+            # 這些框不進入跌倒確認，避免 IoUMatcher 的 ID 與 ByteTrack 的 ID 混在同一個 FallConfirmer.tracks
+            decoded = [self.drop_untracked(result) for result in decoded]
+        self.last_events = []  # 這一幀新確認的跌倒事件
+        # 標註不直接畫在 frame 上，frame 會用於推論與存檔，由顯示端畫在自己的影像上
+        self.overlays = []
+        with self.telemetry.stage("rules"):
+            if self.model_name in COMBINED_MODELS.values():
+                self.detect_fall_combined(frame, decoded, fall_class_id, timestamp)
+            elif "pose" in self.model_name:
+                self.detect_fall_with_pose(frame, decoded, fall_class_id, timestamp)
+            else:
+                self.detect_fall_with_bounding_box(frame, decoded, fall_class_id, timestamp)
+
+    def drop_untracked(self, result):
+        if result.track_ids is not None:
+            return result
+        untracked = result.select(np.zeros(len(result), dtype=bool))
+        untracked.track_ids = []
+        return untracked
+
+    def detect_fall_with_bounding_box(self, frame, results, fall_class_id, timestamp=None):
+        # results 為 result_decoder.DecodedResult 列表
+        for result in results:
+            # 連續多幀判定跌倒才確認；使用 model.track 時沿用追蹤 ID，否則由 IoU 配對
+            states = self.fall_confirmer.update(result.boxes, result.class_mask(fall_class_id), result.track_ids, timestamp)
+            for state in states:
+                if state.confirmed:
+                    x1, y1, x2, y2 = map(int, state.box)
+                    self.overlays.append(("rect", (x1, y1), (x2, y2), (0, 0, 255), 2))
+                    self.overlays.append(("text", "Fall Detected", (x1, y1 - 10), 1, (0, 0, 255), 2))
+                    self.report_fall(frame, state)
+
+    def detect_fall_with_pose(self, frame, results, fall_class_id, timestamp=None):
+        for result in results:
+            keypoints = result.keypoints
+            if keypoints is not None and keypoints.shape[0] > 0:  # 有偵測測到人，keypoints.shape[0]取得人數
+                self.draw_predictions(result)
+                # 確保 boxes 有足夠的元素，keypoints 與 boxes 依索引對應同一個人
+                count = min(keypoints.shape[0], len(result))
+                bboxes = result.boxes[:count]
+                # 一次判斷所有人的姿勢
+                falls = is_fall_pose_batch(keypoints[:count], bboxes)
+                track_ids = result.track_ids
+                if track_ids is not None:
+                    track_ids = track_ids[:count]
+                # 連續多幀判定跌倒才確認
+                states = self.fall_confirmer.update(bboxes, falls, track_ids, timestamp)
+                for i, state in enumerate(states):  # i表第i個人
+                    if state.confirmed:
+                        x, y = int(keypoints[i, 0, 0]), int(keypoints[i, 0, 1])
+                        self.overlays.append(("text", "Fall Detected (Pose)", (x, y - 10), 1, (0, 0, 255), 2))
+                        self.report_fall(frame, state)
+            else:
+                # 沒有人時也要更新，舊的追蹤狀態才會逾時移除
+                self.fall_confirmer.update(np.zeros((0, 4), dtype=np.float32), [], result.track_ids, timestamp)
+
+    def detect_fall_combined(self, frame, results, fall_class_id, timestamp=None):
+        # 組合模式：框模型的判斷與對應到的姿勢判斷融合
+        for result in results:
+            self.draw_predictions(result)
+            box_flags = result.class_mask(fall_class_id)
+            pose_flags = is_fall_pose_batch(result.keypoints, result.boxes)
+            falls = fuse_decisions(box_flags, pose_flags, result.pose_matched, self.model.fusion)
+            states = self.fall_confirmer.update(result.boxes, falls, result.track_ids, timestamp)
+            for state in states:
+                if state.confirmed:
+                    x1, y1, x2, y2 = map(int, state.box)
+                    self.overlays.append(("rect", (x1, y1), (x2, y2), (0, 0, 255), 2))
+                    self.overlays.append(("text", "Fall Detected (Fused)", (x1, y1 - 10), 1, (0, 0, 255), 2))
+                    self.report_fall(frame, state)
+
+    def report_fall(self, frame, state):
+        if state.newly_confirmed:
+            self.last_events.append(state)
+            if self.clip_recorder is not None:
+                self.clip_recorder.trigger(state.event_id)
+        if self.snapshot_writer is None:
+            return
+        current_time = datetime.now()
+        send = self.last_sent_time is None or (current_time - self.last_sent_time).seconds >= 3
+        # 圖片寫完檔之後才傳送 LINE Notify
+        callback = (lambda filename: self.send_to_line_notify(filename, current_time)) if send else None
+        filename = self.snapshot_writer.submit(frame, state.event_id, current_time, callback)
+        if filename is not None and send:
+            self.last_sent_time = current_time
+
+    def draw_predictions(self, result):
+        # 繪製預測框（加入標註清單，只畫在顯示用的影像上）
+        for (x1, y1, x2, y2), conf, cls in zip(result.boxes.astype(int).tolist(), result.conf.tolist(), result.cls.tolist()):
+            label = f"{cls} {conf:.2f}"
+            self.overlays.append(("rect", (x1, y1), (x2, y2), (0, 255, 0), 2))
+            self.overlays.append(("text", label, (x1, y1 - 10), 0.5, (255, 0, 0), 2))
+
+        '''
+        # 繪製關鍵點並標號，顯示所有人
+        for person_keypoints in result.keypoints.xy:
+            for i, keypoint in enumerate(person_keypoints):
+                x, y = int(keypoint[0]), int(keypoint[1])
+                if x == 0 and y == 0:
+                    cv2.circle(frame, (x, y), 5, (255, 0, 0), -1)
+                    cv2.putText(frame, f"KP{i}", (x + 5, y + 5), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+                else:
+                    cv2.circle(frame, (x, y), 5, (0, 0, 255), -1)
+                    cv2.putText(frame, f"KP{i}", (x + 5, y + 5), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        '''
+        
+
+
+    def is_fall_pose(self, keypoints, bbox):
+        # 單人的姿勢判斷，規則實作在 pose_rules.is_fall_pose
+        return is_fall_pose(keypoints, bbox)
+
+    def send_to_line_notify(self, image_path, time):
+        # 只放進佇列，實際傳送在 AlertDispatcher 的背景執行緒
+        if self.alert_dispatcher is not None:
+            self.alert_dispatcher.send(image_path, time)
+
+    def close(self):
+        # 偵測結束時呼叫：先等快照寫完（寫完才會排入告警），再輸出事件影片、送完告警，並結束各自的背景執行緒
+        # 不把屬性設為 None：結束時還沒停下的擷取或推論執行緒再送進來的影像與告警由各自的 close 狀態丟棄
+        if self.snapshot_writer is not None:
+            self.snapshot_writer.close()
+            print(self.snapshot_writer.summary())
+        if self.clip_recorder is not None:
+            self.clip_recorder.close()
+            print(self.clip_recorder.summary())
+        if self.alert_dispatcher is not None:
+            self.alert_dispatcher.close()
+        # enable_metrics 啟動的 HTTP 伺服器與輸出執行緒
+        self.telemetry.stop()
@@ -0,0 +1,129 @@
+# frame_pipeline.py
+
+import queue
+import threading
+import time
+import cv2
+from inference_scheduler import AdaptiveScheduler
+
+# 佇列結束標記
+END = object()
+
+
+class LatestQueue:
+    # 有界佇列，滿了就丟掉最舊的一筆，讓下游永遠拿到最新的幀
+    def __init__(self, maxsize=1):
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def put(self, item):
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def put_wait(self, item, stop_event):
+        # 影片檔不丟幀，等待下游有空位
+        while not stop_event.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(self, timeout=0.1):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class FramePipeline:
+    # 擷取 → 推論 → 顯示 三段式管線
+    # 擷取與推論各自一個執行緒，顯示留在主執行緒（cv2.imshow 必須在主執行緒呼叫）
+    # display 為 None 時不顯示，只統計延遲
+    def __init__(self, logic, cap, fall_class_id=0, is_video=False, queue_size=1, display=None):
+        self.logic = logic
+        self.display = display
+        self.cap = cap
+        self.fall_class_id = fall_class_id
+        self.is_video = is_video
+        self.frame_queue = LatestQueue(queue_size)
+        self.display_queue = LatestQueue(queue_size)
+        # 與偵測邏輯共用停止訊號，logic.stop() 也能結束管線
+        self.stop_event = logic.stop_event
+        # 攝影機依場景調整推論頻率，影片則每幀推論
+        self.scheduler = None if is_video else AdaptiveScheduler(cap.get(cv2.CAP_PROP_FPS))
+        self.telemetry = logic.telemetry
+
+    def push(self, target, item):
+        # 攝影機丟掉舊幀，影片檔則等待
+        if self.is_video:
+            target.put_wait(item, self.stop_event)
+        else:
+            dropped = target.dropped
+            target.put(item)
+            if target.dropped != dropped:
+                self.telemetry.increment("frames_dropped", target.dropped - dropped)
+
+    def capture_loop(self):
+        frame_index = 0
+        while not self.stop_event.is_set():
+            start = time.perf_counter()
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+            captured = time.perf_counter()
+            self.telemetry.record("capture", captured - start)
+            self.telemetry.tick("frames_captured")
+            frame_index += 1
+            self.logic.record_frame(frame)
+            self.push(self.frame_queue, (frame_index, captured, frame))
+        self.push(self.frame_queue, END)
+
+    def inference_loop(self):
+        while not self.stop_event.is_set():
+            item = self.frame_queue.get()
+            if item is None:
+                continue
+            if item is END:
+                break
+            frame_index, captured, frame = item
+            self.logic.detect_fall_scheduled(frame, frame_index, self.fall_class_id, self.scheduler)
+            self.push(self.display_queue, (frame_index, captured, frame, self.logic.overlays))
+        self.push(self.display_queue, END)
+
+    def run(self):
+        threads = [
+            threading.Thread(target=self.capture_loop, daemon=True),
+            threading.Thread(target=self.inference_loop, daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+
+        while not self.stop_event.is_set():
+            item = self.display_queue.get()
+            if item is None:
+                if not any(thread.is_alive() for thread in threads):
+                    break
+                continue
+            if item is END:
+                break
+            frame_index, captured, frame, overlays = item
+            with self.telemetry.stage("display"):
+                keep_running = self.display is None or self.display.show(frame, self.logic.with_telemetry_overlay(overlays))
+            self.telemetry.record("end_to_end", time.perf_counter() - captured)
+            self.telemetry.tick("frames_processed")
+            if not keep_running:
+                break
+
+        self.stop_event.set()
+        for thread in threads:
+            thread.join(timeout=2)
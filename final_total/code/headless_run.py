@@ -0,0 +1,50 @@
+# headless_run.py
+
+import argparse
+import os
+import signal
+import cv2
+from fall_detection_logic import FallDetectionLogic
+from display_sinks import OpenCVWindowSink
+from multi_camera import parse_source, is_live_source
+from roi import load_roi_config, roi_for
+
+
+if __name__ == '__main__':
+    # 不需要 Qt 或顯示器，可作為伺服器上的背景服務執行
+    parser = argparse.ArgumentParser(description="無視窗模式的跌倒偵測")
+    parser.add_argument("source", help="攝影機編號、RTSP 網址或影片路徑")
+    parser.add_argument("--model", default="yolov11best.pt", help="模型權重路徑")
+    parser.add_argument("--backend", default="torch", choices=["torch", "onnx", "openvino", "openvino-int8"], help="推論後端")
+    parser.add_argument("--threads", type=int, default=None, help="推論執行緒數")
+    parser.add_argument("--token", default=os.environ.get("LINE_TOKEN", ""), help="LINE Notify Token")
+    parser.add_argument("--motion-gate", action="store_true", help="畫面靜止時略過推論")
+    parser.add_argument("--show", action="store_true", help="仍然開啟 OpenCV 視窗（除錯用）")
+    parser.add_argument("--stats-overlay", action="store_true", help="在視窗上顯示即時統計")
+    parser.add_argument("--metrics-port", type=int, default=None, help="在本機此埠提供 /metrics")
+    parser.add_argument("--metrics-file", default=None, help="定期輸出 Prometheus 格式的統計檔")
+    parser.add_argument("--roi-config", default=None, help="監控區域設定檔（JSON）")
+    parser.add_argument("--imgsz", default=None, help="推論解析度，例如 640，auto 表示依負載自動調整")
+    parser.add_argument("--tracker", default=None, choices=["iou", "bytetrack"], help="追蹤器，讓每個人跨幀保持同一個 ID")
+    args = parser.parse_args()
+
+    source = parse_source(args.source)
+    roi = roi_for(load_roi_config(args.roi_config), args.source) if args.roi_config else None
+    fall_detector = FallDetectionLogic(args.model, args.token, motion_gate=args.motion_gate,
+                                       backend=args.backend, threads=args.threads, roi=roi, imgsz=args.imgsz,
+                                       tracker=args.tracker)
+    fall_detector.verbose = False
+    fall_detector.show_telemetry = args.stats_overlay
+    fall_detector.enable_metrics(port=args.metrics_port, path=args.metrics_file)
+
+    # 收到 Ctrl+C 或 SIGTERM 時正常結束，等待快照與告警送完
+    def handle_signal(signum, frame):
+        fall_detector.stop()
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    display = OpenCVWindowSink() if args.show else None
+    if is_live_source(source):
+        fall_detector.run_pipelined(cv2.VideoCapture(source), is_video=False, display=display)
+    else:
+        fall_detector.run(cv2.VideoCapture(source), is_video=True, display=display)
@@ -0,0 +1,120 @@
+# inference_backend.py
+
+import argparse
+import glob
+import os
+import numpy as np
+from ultralytics import YOLO
+
+# 後端名稱 -> ultralytics export 的格式
+EXPORT_FORMATS = {
+    "onnx": "onnx",
+    "openvino": "openvino",
+    "openvino-int8": "openvino",
+}
+
+
+def model_task(model_path):
+    return "pose" if "pose" in os.path.basename(model_path) else "detect"
+
+
+def exported_path(pt_path, backend):
+    # ultralytics 匯出後的檔名：xxx.onnx、xxx_openvino_model/、xxx_int8_openvino_model/
+    base = os.path.splitext(pt_path)[0]
+    if backend == "onnx":
+        return base + ".onnx"
+    if backend == "openvino":
+        return base + "_openvino_model"
+    if backend == "openvino-int8":
+        return base + "_int8_openvino_model"
+    return pt_path
+
+
+def is_dynamic_export(path, backend):
+    # 匯出的模型輸入是否為動態大小（批次與解析度），舊版匯出的固定大小模型需要重新轉檔
+    if backend == "onnx":
+        import onnx
+        dims = onnx.load(path, load_external_data=False).graph.input[0].type.tensor_type.shape.dim
+        return any(dim.dim_param for dim in dims)
+    import openvino as ov
+    xml_path = glob.glob(os.path.join(path, "*.xml"))[0]
+    return ov.Core().read_model(xml_path).inputs[0].get_partial_shape().is_dynamic
+
+
+def export_model(pt_path, backend, imgsz=640, **kwargs):
+    # 一次性轉檔，已經轉過且比 .pt 新就直接使用
+    # 匯出成動態輸入大小，多路攝影機的批次、組合模式的裁切（256）與低解析度框模型（320）都能使用
+    # INT8 需要校正資料，kwargs 要帶 data=data.yaml（見 quantize_model.py）
+    if backend == "torch":
+        return pt_path
+    target = exported_path(pt_path, backend)
+    if (os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(pt_path)
+            and is_dynamic_export(target, backend)):
+        return target
+    if backend == "openvino-int8":
+        if "data" not in kwargs:
+            raise FileNotFoundError(f"找不到動態輸入的 INT8 模型 {target}，請先執行 quantize_model.py")
+        kwargs["int8"] = True
+    print(f"轉出 {pt_path} -> {backend}")
+    return YOLO(pt_path).export(format=EXPORT_FORMATS[backend], imgsz=imgsz, dynamic=True, **kwargs)
+
+
+def load_model(model_path, backend="torch", threads=None):
+    # 回傳 ultralytics 的 YOLO 物件，不論後端 predict 結果都是相同的 result.boxes / result.keypoints
+    if backend == "torch":
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+        return YOLO(model_path)
+
+    path = export_model(model_path, backend) if model_path.endswith(".pt") else model_path
+    model = YOLO(path, task=model_task(model_path))
+    if threads:
+        set_backend_threads(model, backend, path, threads)
+    return model
+
+
+def set_backend_threads(model, backend, path, threads):
+    # ultralytics 沒有提供執行緒數的設定，先推論一次建立 AutoBackend，再用指定的執行緒數重建推論 session
+    model.predict(np.zeros((640, 640, 3), dtype=np.uint8), verbose=False)
+    auto_backend = model.predictor.model
+    if backend == "onnx" and hasattr(auto_backend, "session"):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        providers = auto_backend.session.get_providers()
+        session = ort.InferenceSession(path, options, providers=providers)
+        auto_backend.session = session
+        if getattr(auto_backend, "io", None) is not None and getattr(auto_backend, "bindings", None):
+            # 部分 ultralytics 版本對固定大小的 ONNX 用原本 session 建立的 io_binding 推論，要在新 session 上重新綁定
+            auto_backend.io = session.io_binding()
+            for output, tensor in zip(session.get_outputs(), auto_backend.bindings):
+                auto_backend.io.bind_output(name=output.name, device_type=tensor.device.type,
+                                            device_id=tensor.device.index or 0,
+                                            element_type=np.float16 if auto_backend.fp16 else np.float32,
+                                            shape=tuple(tensor.shape), buffer_ptr=tensor.data_ptr())
+        print(f"ONNX Runtime 執行緒數：{session.get_session_options().intra_op_num_threads}")
+    elif backend in ("openvino", "openvino-int8") and hasattr(auto_backend, "ov_compiled_model"):
+        import openvino as ov
+        core = ov.Core()
+        xml_path = glob.glob(os.path.join(path, "*.xml"))[0]
+        config = {"INFERENCE_NUM_THREADS": threads, "PERFORMANCE_HINT": "LATENCY"}
+        auto_backend.ov_compiled_model = core.compile_model(core.read_model(xml_path), device_name="CPU", config=config)
+    else:
+        print(f"此版本的 ultralytics 無法設定 {backend} 的執行緒數，使用預設值")
+
+
+if __name__ == '__main__':
+    # 把訓練好的 *best.pt 一次轉出成 CPU 推論用的格式
+    parser = argparse.ArgumentParser(description="轉出 ONNX / OpenVINO 模型")
+    parser.add_argument("weights", nargs="*", help="模型權重，預設為目前資料夾的 *best.pt")
+    parser.add_argument("--backend", choices=sorted(EXPORT_FORMATS), action="append", help="可重複指定，預設兩種都轉")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--data", default=None, help="INT8 校正用的 data.yaml")
+    args = parser.parse_args()
+
+    extra = {"data": args.data} if args.data else {}
+    for weight in args.weights or glob.glob("*best.pt"):
+        for backend in args.backend or ["onnx", "openvino"]:
+            print(export_model(weight, backend, imgsz=args.imgsz, **(extra if backend == "openvino-int8" else {})))
@@ -0,0 +1,92 @@
+# inference_scheduler.py
+
+import math
+import time
+from collections import deque
+
+# 自動模式可選用的推論解析度（32 的倍數）
+IMGSZ_STEPS = (320, 416, 480, 544, 640, 736, 832)
+
+
+class AdaptiveScheduler:
+    # 場景平靜時每 N 幀推論一次，偵測到人或畫面變動超過門檻時改為每幀推論
+    # N 依來源幀率與實際推論時間自動調整
+    def __init__(self, source_fps, calm_rate=3, motion_threshold=0.02, hold_seconds=2, max_interval=30):
+        # CAP_PROP_FPS 讀不到時會回傳 0
+        self.source_fps = source_fps if source_fps and source_fps > 0 else 30.0
+        self.calm_rate = calm_rate  # 平靜時每秒推論幾次
+        self.motion_threshold = motion_threshold
+        self.hold_frames = int(self.source_fps * hold_seconds)  # 偵測到人之後維持每幀推論的幀數
+        self.max_interval = max_interval
+        self.active_until = 0
+        self.last_inference_index = None
+        self.inference_time = None  # 推論時間的移動平均（秒）
+        self.interval = 1
+        self.skipped = 0
+
+    def keep_up_interval(self):
+        # 要跟上來源幀率，至少要間隔 推論時間 x FPS 幀
+        if self.inference_time is None:
+            return 1
+        return max(1, math.ceil(self.inference_time * self.source_fps))
+
+    def should_infer(self, frame_index, motion_score=None):
+        if motion_score is not None and motion_score >= self.motion_threshold:
+            self.active_until = max(self.active_until, frame_index + self.hold_frames)
+
+        if frame_index <= self.active_until:
+            self.interval = 1
+        else:
+            calm_interval = math.ceil(self.source_fps / self.calm_rate)
+            self.interval = min(self.max_interval, max(calm_interval, self.keep_up_interval()))
+
+        if self.last_inference_index is None or frame_index - self.last_inference_index >= self.interval:
+            return True
+        self.skipped += 1
+        return False
+
+    def update(self, frame_index, person_detected, inference_time):
+        self.last_inference_index = frame_index
+        if self.inference_time is None:
+            self.inference_time = inference_time
+        else:
+            self.inference_time = 0.8 * self.inference_time + 0.2 * inference_time
+        if person_detected:
+            self.active_until = frame_index + self.hold_frames
+
+
+class ImgszController:
+    # 自動調整推論解析度：達成 FPS 低於來源 FPS 時降一級，推論時間有餘裕時升一級
+    # 只用於 PyTorch 權重；匯出的 ONNX / OpenVINO 模型雖然是動態輸入，但每換一種大小都要重新配置，頻繁切換反而變慢
+    def __init__(self, imgsz=640, steps=IMGSZ_STEPS, low_ratio=0.9, headroom=0.7, interval=5.0, window=10):
+        self.steps = sorted(steps)
+        self.index = min(range(len(self.steps)), key=lambda i: abs(self.steps[i] - imgsz))
+        self.low_ratio = low_ratio  # 達成 FPS 低於來源 FPS 的這個比例時降級
+        self.headroom = headroom  # 預估升級後的推論時間低於每幀時間的這個比例才升級
+        self.interval = interval  # 兩次調整至少間隔的秒數，避免來回跳動
+        self.latencies = deque(maxlen=window)
+        self.last_change = time.perf_counter()
+
+    @property
+    def imgsz(self):
+        return self.steps[self.index]
+
+    def update(self, inference_time, achieved_fps, source_fps):
+        # 每次推論後呼叫，回傳下一次要使用的 imgsz
+        self.latencies.append(inference_time)
+        now = time.perf_counter()
+        if not source_fps or len(self.latencies) < self.latencies.maxlen or now - self.last_change < self.interval:
+            return self.imgsz
+        latency = sorted(self.latencies)[len(self.latencies) // 2]
+        if achieved_fps < source_fps * self.low_ratio and self.index > 0:
+            self.index -= 1
+        elif (achieved_fps >= source_fps * self.low_ratio and self.index < len(self.steps) - 1
+              and latency * (self.steps[self.index + 1] / self.imgsz) ** 2 < self.headroom / source_fps):
+            # 推論時間大致與像素數成正比
+            self.index += 1
+        else:
+            return self.imgsz
+        self.last_change = now
+        self.latencies.clear()
+        print(f"推論解析度調整為 {self.imgsz}（達成 {achieved_fps:.1f} / 來源 {source_fps:.1f} FPS）")
+        return self.imgsz
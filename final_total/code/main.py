@@ -1,64 +1,88 @@
-# main.py
-
-import sys
-import cv2
-from PyQt5.QtWidgets import QApplication
-from fall_detection_ui import FallDetectionUI
-from fall_detection_logic import FallDetectionLogic
-
-def main():
-    # 初始化 GUI 應用程式
-    app = QApplication(sys.argv)
-    window = FallDetectionUI()
-
-    # 連接攝影機按鈕功能
-    window.cam_button.clicked.connect(lambda: start_camera(window))
-
-    # 連接選擇影片按鈕功能
-    window.video_button.clicked.connect(lambda: open_video(window))
-
-    # 顯示視窗
-    window.show()
-    sys.exit(app.exec_())
-
-def start_camera(window):
-    # 獲取使用者輸入的 Line Token
-    line_token = window.line_token_input.text()
-    # 檢查 Line Token 是否已輸入
-    if not line_token:
-        print("請輸入 LINE Token!")
-        return
-    # 獲取使用者選擇的模型
-    selected_model = window.model_selector.currentText() 
-    model_path = f"{selected_model.lower()}best.pt"
-    print(model_path)
-    # 初始化偵測邏輯
-    fall_detector = FallDetectionLogic(model_path, line_token, window)
-    # 啟動攝影機偵測
-    window.hide()  # hide主視窗
-    fall_detector.run(cv2.VideoCapture(0), is_video=False)
-    # 當偵測結束後，重新開啟主視窗
-    window.show()
-
-def open_video(window):
-    # 獲取使用者輸入的 Line Token
-    line_token = window.line_token_input.text()
-    # 檢查 Line Token 是否已輸入
-    if not line_token:
-        print("請輸入 LINE Token!")
-        return
-    
-    # 獲取使用者選擇的模型
-    selected_model = window.model_selector.currentText() 
-    model_path = f"{selected_model.lower()}best.pt"
-    print(model_path)
-    # 初始化偵測邏輯
-    fall_detector = FallDetectionLogic(model_path, line_token, window)
-    # 啟動影片偵測
-    video_path = window.get_video_file()
-    if video_path:
-        window.hide()  # hide主視窗
-        fall_detector.run(cv2.VideoCapture(video_path), is_video=True)
-
-if __name__ == '__main__':
-    main()
+# main.py
+
+import os
+import sys
+import cv2
+from PyQt5.QtWidgets import QApplication
+from fall_detection_ui import FallDetectionUI
+from fall_detection_logic import FallDetectionLogic
+from display_sinks import OpenCVWindowSink
+from model_registry import preload_model, model_path_for
+from roi import load_roi_config, roi_for
+
+# 監控區域設定檔，不存在時整個畫面都偵測
+ROI_CONFIG_PATH = "roi_config.json"
+
+def main():
+    # 初始化 GUI 應用程式
+    app = QApplication(sys.argv)
+    window = FallDetectionUI()
+
+    # 連接攝影機按鈕功能
+    window.cam_button.clicked.connect(lambda: start_camera(window))
+
+    # 連接選擇影片按鈕功能
+    window.video_button.clicked.connect(lambda: open_video(window))
+
+    # 切換模型或後端時在背景預先載入，按下按鈕時就不用等待
+    window.model_selector.currentTextChanged.connect(lambda text: preload_selected_model(window))
+    window.backend_selector.currentTextChanged.connect(lambda text: preload_selected_model(window))
+    preload_selected_model(window)
+
+    # 顯示視窗
+    window.show()
+    sys.exit(app.exec_())
+
+def preload_selected_model(window):
+    preload_model(model_path_for(window.model_selector.currentText()), window.backend_selector.currentData())
+
+def load_roi(*keys):
+    if not os.path.exists(ROI_CONFIG_PATH):
+        return None
+    return roi_for(load_roi_config(ROI_CONFIG_PATH), *keys)
+
+def start_camera(window):
+    # 獲取使用者輸入的 Line Token
+    line_token = window.line_token_input.text()
+    # 檢查 Line Token 是否已輸入
+    if not line_token:
+        print("請輸入 LINE Token!")
+        return
+    # 獲取使用者選擇的模型
+    selected_model = window.model_selector.currentText() 
+    model_path = model_path_for(selected_model)
+    print(model_path)
+    # 初始化偵測邏輯，攝影機畫面靜止時略過推論，推論解析度依負載自動調整
+    # 追蹤器在略過推論的幀預測每個人的位置
+    fall_detector = FallDetectionLogic(model_path, line_token, window, motion_gate=True,
+                                       backend=window.backend_selector.currentData(), roi=load_roi(0), imgsz="auto",
+                                       tracker="iou")
+    # 啟動攝影機偵測
+    window.hide()  # hide主視窗
+    fall_detector.run_pipelined(cv2.VideoCapture(0), is_video=False, display=OpenCVWindowSink())
+    # 當偵測結束後，重新開啟主視窗
+    window.show()
+
+def open_video(window):
+    # 獲取使用者輸入的 Line Token
+    line_token = window.line_token_input.text()
+    # 檢查 Line Token 是否已輸入
+    if not line_token:
+        print("請輸入 LINE Token!")
+        return
+    
+    # 獲取使用者選擇的模型
+    selected_model = window.model_selector.currentText() 
+    model_path = model_path_for(selected_model)
+    print(model_path)
+    # 啟動影片偵測
+    video_path = window.get_video_file()
+    if video_path:
+        # 初始化偵測邏輯，監控區域依影片檔名設定
+        fall_detector = FallDetectionLogic(model_path, line_token, window, backend=window.backend_selector.currentData(),
+                                           roi=load_roi(video_path, os.path.basename(video_path)))
+        window.hide()  # hide主視窗
+        fall_detector.run(cv2.VideoCapture(video_path), is_video=True, display=OpenCVWindowSink())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+# model_registry.py
+
+import threading
+from collections import OrderedDict
+import numpy as np
+from inference_backend import load_model
+from ensemble import EnsembleDetector, CascadeDetector
+
+
+class ModelRegistry:
+    # 全程式共用的模型快取，以 (模型路徑, 推論後端, 執行緒數) 為 key，執行緒數不同的模型分開載入
+    # 第一次使用時才載入，可選擇先跑一次暖機推論，超過 max_models 個時移除最久沒用的
+    def __init__(self, max_models=2, warmup=True):
+        self.max_models = max_models
+        self.warmup = warmup
+        self.models = OrderedDict()
+        self.loading = {}  # 正在載入的 key -> threading.Event
+        self.lock = threading.Lock()
+
+    def get(self, model_path, backend="torch", threads=None):
+        key = (model_path, backend, threads)
+        while True:
+            with self.lock:
+                if key in self.models:
+                    self.models.move_to_end(key)
+                    return self.models[key]
+                event = self.loading.get(key)
+                owner = event is None
+                if owner:
+                    event = self.loading[key] = threading.Event()
+            if not owner:
+                # 其他執行緒正在載入同一個模型，等它完成
+                event.wait()
+                continue
+
+            try:
+                model = self.load(model_path, backend, threads)
+                with self.lock:
+                    self.models[key] = model
+                    while len(self.models) > self.max_models:
+                        evicted, _ = self.models.popitem(last=False)
+                        print(f"移除快取模型 {evicted}")
+                return model
+            finally:
+                with self.lock:
+                    self.loading.pop(key, None)
+                event.set()
+
+    def load(self, model_path, backend="torch", threads=None):
+        print(f"載入模型 {model_path} ({backend})")
+        model = load_model(model_path, backend, threads)
+        if self.warmup:
+            # 第一次推論會做初始化，先用空白影像跑一次
+            model.predict(np.zeros((640, 640, 3), dtype=np.uint8), verbose=False)
+        return model
+
+    def preload(self, model_path, backend="torch", threads=None):
+        # 在背景執行緒預先載入，例如下拉選單切換模型時
+        threading.Thread(target=self.try_get, args=(model_path, backend, threads), daemon=True).start()
+
+    def try_get(self, model_path, backend="torch", threads=None):
+        try:
+            self.get(model_path, backend, threads)
+        except Exception as e:
+            print(f"預先載入模型失敗 {model_path}：{e}")
+
+
+registry = ModelRegistry()
+
+# 組合多個模型的模式：介面名稱 -> 模型名稱，使用的框模型與姿勢模型權重
+COMBINED_MODELS = {"ENSEMBLE": "ensemble", "CASCADE": "cascade"}
+DETECTOR_WEIGHTS = "yolov11best.pt"
+POSE_WEIGHTS = "yolo11n-posebest.pt"
+
+
+def model_path_for(selected_model):
+    # 介面上 model_selector 的名稱對應到權重檔，例如 YOLO11N-POSE -> yolo11n-posebest.pt
+    if selected_model in COMBINED_MODELS:
+        return COMBINED_MODELS[selected_model]
+    return f"{selected_model.lower()}best.pt"
+
+
+def get_model(model_path, backend="torch", threads=None):
+    if model_path == COMBINED_MODELS["ENSEMBLE"]:
+        # 組合模式本身不佔快取，兩個模型各自從快取取得
+        return EnsembleDetector(registry.get(DETECTOR_WEIGHTS, backend, threads),
+                                registry.get(POSE_WEIGHTS, backend, threads))
+    if model_path == COMBINED_MODELS["CASCADE"]:
+        return CascadeDetector(registry.get(DETECTOR_WEIGHTS, backend, threads),
+                               registry.get(POSE_WEIGHTS, backend, threads))
+    return registry.get(model_path, backend, threads)
+
+
+def preload_model(model_path, backend="torch", threads=None):
+    if model_path in COMBINED_MODELS.values():
+        for weights in (DETECTOR_WEIGHTS, POSE_WEIGHTS):
+            registry.preload(weights, backend, threads)
+        return
+    registry.preload(model_path, backend, threads)
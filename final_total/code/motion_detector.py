@@ -0,0 +1,64 @@
+# motion_detector.py
+
+import cv2
+
+
+class MotionDetector:
+    # 在縮小的灰階影像上做幀差（或背景相減），回傳畫面中變動像素的比例 (0~1)
+    # method: "diff" 幀差，"mog2" 背景相減
+    def __init__(self, width=160, pixel_threshold=25, method="diff"):
+        self.width = width
+        self.pixel_threshold = pixel_threshold
+        self.previous = None
+        self.subtractor = None
+        if method == "mog2":
+            self.subtractor = cv2.createBackgroundSubtractorMOG2(history=300, varThreshold=self.pixel_threshold, detectShadows=False)
+        # 同一幀只計算一次，排程器與動態閘門共用結果
+        self.last_frame = None
+        self.last_score = 0.0
+
+    def preprocess(self, frame):
+        height = max(1, int(frame.shape[0] * self.width / frame.shape[1]))
+        small = cv2.resize(frame, (self.width, height), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def score(self, frame):
+        if frame is self.last_frame:
+            return self.last_score
+        self.last_frame = frame
+        self.last_score = self.compute(frame)
+        return self.last_score
+
+    def compute(self, frame):
+        gray = self.preprocess(frame)
+        if self.subtractor is not None:
+            mask = self.subtractor.apply(gray)
+            return cv2.countNonZero(mask) / mask.size
+        if self.previous is None or self.previous.shape != gray.shape:
+            # 第一幀沒有比較對象，視為有變動
+            self.previous = gray
+            return 1.0
+        diff = cv2.absdiff(gray, self.previous)
+        self.previous = gray
+        _, mask = cv2.threshold(diff, self.pixel_threshold, 255, cv2.THRESH_BINARY)
+        return cv2.countNonZero(mask) / mask.size
+
+
+class MotionGate:
+    # 放在 YOLO 推論前的動態閘門，畫面靜止時直接略過推論
+    def __init__(self, detector=None, threshold=0.005, max_skip=30):
+        self.detector = detector if detector is not None else MotionDetector()
+        self.threshold = threshold
+        self.max_skip = max_skip  # 連續略過太多幀時強制推論一次
+        self.skip_streak = 0
+        self.gated = 0  # 被略過的幀數
+
+    def allow(self, frame, person_present=False):
+        # 畫面中已經有人（可能倒地不動）時不略過
+        if person_present or self.skip_streak >= self.max_skip or self.detector.score(frame) >= self.threshold:
+            self.skip_streak = 0
+            return True
+        self.skip_streak += 1
+        self.gated += 1
+        return False
@@ -0,0 +1,208 @@
+# multi_camera.py
+
+import argparse
+import os
+import threading
+import time
+import cv2
+from fall_detection_logic import FallDetectionLogic
+from model_registry import get_model
+from display_sinks import OpenCVWindowSink
+from roi import load_roi_config, roi_for
+
+
+def parse_source(source):
+    # 數字視為攝影機編號，其餘當作 RTSP/HTTP 網址或影片路徑
+    if isinstance(source, int):
+        return source
+    if source.isdigit():
+        return int(source)
+    return source
+
+
+def is_live_source(source):
+    if isinstance(source, int):
+        return True
+    return source.lower().startswith(("rtsp://", "rtmp://", "http://", "https://"))
+
+
+class CameraStream:
+    # 每個來源一條擷取執行緒，只保留最新的一幀
+    # on_frame(frame) 在擷取執行緒對每一幀呼叫（例如事件影片的緩衝），不佔用批次推論的迴圈
+    def __init__(self, source, name, on_frame=None):
+        self.source = source
+        self.name = name
+        self.on_frame = on_frame
+        self.cap = cv2.VideoCapture(source)
+        # 即時串流丟掉舊幀，影片檔則等待取走後再讀下一幀
+        self.drop_frames = is_live_source(source)
+        self.condition = threading.Condition()
+        self.frame = None
+        self.frame_id = 0
+        self.consumed_id = 0
+        self.stopped = False
+        self.thread = threading.Thread(target=self.update, daemon=True)
+
+    def start(self):
+        if not self.cap.isOpened():
+            print(f"無法開啟來源 {self.source}")
+            self.stopped = True
+            return
+        self.thread.start()
+
+    def update(self):
+        while not self.stopped:
+            if not self.drop_frames:
+                with self.condition:
+                    while self.frame_id != self.consumed_id and not self.stopped:
+                        self.condition.wait(0.1)
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+            if self.on_frame is not None:
+                self.on_frame(frame)
+            with self.condition:
+                self.frame = frame
+                self.frame_id += 1
+        self.stopped = True
+
+    def latest(self):
+        # 沒有新幀時回傳 None
+        with self.condition:
+            if self.frame_id == self.consumed_id:
+                return None
+            self.consumed_id = self.frame_id
+            self.condition.notify()
+            return self.frame
+
+    def finished(self):
+        with self.condition:
+            return self.stopped and self.frame_id == self.consumed_id
+
+    def stop(self):
+        self.stopped = True
+        if self.thread.is_alive():
+            self.thread.join(timeout=2)
+        self.cap.release()
+
+
+class MultiCameraRunner:
+    # 一個模型服務多路攝影機：收集每路最新的幀，合併成一次批次 predict
+    def __init__(self, model_path, sources, line_token, fall_class_id=0, show=True, motion_gate=False,
+                 backend="torch", threads=None, roi_config=None, imgsz=None,
+                 tracker=None):
+        self.model = get_model(model_path, backend, threads)
+        self.fall_class_id = fall_class_id
+        self.show = show
+        self.streams = []
+        self.logics = []
+        self.displays = []
+        # imgsz 可以是單一設定或每路一個（數字或 "auto"）
+        imgsz_list = list(imgsz) if isinstance(imgsz, (list, tuple)) else [imgsz]
+        if len(imgsz_list) == 1:
+            imgsz_list *= len(sources)
+        if len(imgsz_list) != len(sources):
+            raise ValueError("imgsz 的數量必須是 1 或與來源數相同")
+        for i, source in enumerate(sources):
+            name = f"cam{i}"
+            # 每路各自的跌倒邏輯與存檔資料夾，共用同一個模型
+            logic = FallDetectionLogic(model_path, line_token, None, model=self.model,
+                                       save_dir=os.path.join("detected_falls", name),
+                                       motion_gate=motion_gate, roi=roi_for(roi_config, source, name),
+                                       backend=backend, imgsz=imgsz_list[i], tracker=tracker)
+            self.logics.append(logic)
+            # 事件影片的縮小與 JPEG 編碼在各路的擷取執行緒進行，不拖慢批次推論
+            stream = CameraStream(parse_source(source), name, on_frame=logic.record_frame)
+            self.streams.append(stream)
+            # 每路一個預先配置 buffer 的顯示 sink
+            self.displays.append(OpenCVWindowSink(stream.name, scale_percent=100))
+
+    def run(self):
+        for stream, logic in zip(self.streams, self.logics):
+            stream.start()
+            logic.set_source_fps(stream.cap.get(cv2.CAP_PROP_FPS))
+
+        frame_total = 0
+        batch_count = 0
+        start_time = time.perf_counter()
+        try:
+            while True:
+                batch = []
+                for i, stream in enumerate(self.streams):
+                    frame = stream.latest()
+                    if frame is None:
+                        continue
+                    self.logics[i].telemetry.tick("frames_processed")
+                    gate = self.logics[i].motion_gate
+                    # 畫面靜止的來源不放進這次批次
+                    if gate is not None and not gate.allow(frame, self.logics[i].last_person_count > 0):
+                        self.logics[i].telemetry.increment("frames_gated")
+                        self.logics[i].predict_tracks()
+                        if self.show:
+                            cv2.imshow(stream.name, self.displays[i].render(frame, self.logics[i].overlays))
+                        continue
+                    batch.append((i, frame))
+
+                if not batch:
+                    if all(stream.finished() for stream in self.streams):
+                        break
+                    if self.show and cv2.waitKey(1) == 27:
+                        break
+                    time.sleep(0.002)
+                    continue
+
+                # 推論解析度相同的來源合併成一個批次，有設定監控區域的來源只送區域內的影像
+                groups = {}
+                for i, frame in batch:
+                    groups.setdefault(self.logics[i].imgsz, []).append((i, frame))
+                for imgsz, group in groups.items():
+                    inputs = [self.logics[i].model_input(frame) for i, frame in group]
+                    options = self.logics[group[0][0]].predict_options(self.fall_class_id)
+                    start = time.perf_counter()
+                    results = self.model.predict(inputs, conf=0.5, verbose=False, **options)
+                    elapsed = time.perf_counter() - start
+                    for (i, frame), result in zip(group, results):
+                        # 批次推論時間記在每一路的統計上
+                        self.logics[i].telemetry.record("predict", elapsed)
+                        self.logics[i].telemetry.increment("frames_inferred")
+                        self.logics[i].update_imgsz(elapsed)
+                        self.logics[i].handle_results(frame, [result], self.fall_class_id)
+                        if self.show:
+                            cv2.imshow(self.streams[i].name, self.displays[i].render(frame, self.logics[i].overlays))
+                frame_total += len(batch)
+                batch_count += 1
+
+                if self.show and cv2.waitKey(1) == 27:
+                    break
+        finally:
+            for stream in self.streams:
+                stream.stop()
+            for logic in self.logics:
+                logic.close()
+            if self.show:
+                cv2.destroyAllWindows()
+
+        elapsed = time.perf_counter() - start_time
+        if elapsed > 0 and batch_count:
+            print(f"共處理 {frame_total} 幀，總幀率 {frame_total / elapsed:.1f} FPS，平均批次大小 {frame_total / batch_count:.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="多路攝影機跌倒偵測")
+    parser.add_argument("sources", nargs="+", help="攝影機編號、RTSP 網址或影片路徑")
+    parser.add_argument("--model", default="yolov11best.pt", help="模型權重路徑")
+    parser.add_argument("--token", default=os.environ.get("LINE_TOKEN", ""), help="LINE Notify Token")
+    parser.add_argument("--no-show", action="store_true", help="不開啟顯示視窗")
+    parser.add_argument("--motion-gate", action="store_true", help="畫面靜止時略過推論")
+    parser.add_argument("--backend", default="torch", choices=["torch", "onnx", "openvino", "openvino-int8"], help="推論後端")
+    parser.add_argument("--threads", type=int, default=None, help="推論執行緒數")
+    parser.add_argument("--roi-config", default=None, help="監控區域設定檔（JSON）")
+    parser.add_argument("--imgsz", nargs="+", default=None, help="推論解析度（數字或 auto），可以每路各給一個")
+    # 多路共用同一個模型，ultralytics 的追蹤狀態會混在一起，只提供內建追蹤器
+    parser.add_argument("--tracker", default=None, choices=["iou"], help="內建的 IoU + 卡爾曼追蹤器")
+    args = parser.parse_args()
+
+    roi_config = load_roi_config(args.roi_config) if args.roi_config else None
+    MultiCameraRunner(args.model, args.sources, args.token, show=not args.no_show, motion_gate=args.motion_gate,
+                      backend=args.backend, threads=args.threads, roi_config=roi_config,
+                      imgsz=args.imgsz, tracker=args.tracker).run()
@@ -0,0 +1,92 @@
+# pose_rules.py
+
+import math
+import numpy as np
+
+
+def is_fall_pose_batch(keypoints, boxes):
+    # 一次判斷畫面中所有人的跌倒姿勢，規則與 FallDetectionLogic.is_fall_pose 相同
+    # keypoints: (N, 17, 2) 關鍵點座標，boxes: (N, 4) 邊界框 x1, y1, x2, y2
+    # 回傳長度為 N 的布林陣列
+    keypoints = np.asarray(keypoints, dtype=np.float32)
+    boxes = np.asarray(boxes)
+    count = keypoints.shape[0]
+    if count == 0 or keypoints.ndim != 3 or keypoints.shape[1] != 17:
+        return np.zeros(count, dtype=bool)
+
+    x = keypoints[..., 0]
+    y = keypoints[..., 1]
+    # (0, 0) 視為無效的關鍵點
+    valid = (x != 0) | (y != 0)
+
+    # 身體角度：肩膀中心到臀部中心的連線與地平線的夾角
+    torso_valid = valid[:, 5] & valid[:, 6] & valid[:, 11] & valid[:, 12]
+    dx = (x[:, 11] + x[:, 12]) / 2 - (x[:, 5] + x[:, 6]) / 2
+    dy = (y[:, 11] + y[:, 12]) / 2 - (y[:, 5] + y[:, 6]) / 2
+    angle = np.abs(np.degrees(np.arctan2(dy.astype(np.float64), dx.astype(np.float64))))
+    fall = torso_valid & ((angle < 50) | (angle > 130))
+
+    # 有效關鍵點至少 13 個時，檢查預測框的寬高比 (寬 / 高 > 5 / 3)
+    boxes = boxes.astype(int)
+    width = boxes[:, 2] - boxes[:, 0]
+    height = boxes[:, 3] - boxes[:, 1]
+    fall |= (valid.sum(axis=1) >= 13) & (width * 3 > height * 5)
+
+    # 頭和臀部同時低於膝蓋（左右各判斷一次）
+    fall |= valid[:, 0] & valid[:, 11] & valid[:, 13] & (y[:, 0] >= y[:, 13]) & (y[:, 11] >= y[:, 13])
+    fall |= valid[:, 0] & valid[:, 12] & valid[:, 14] & (y[:, 0] >= y[:, 14]) & (y[:, 12] >= y[:, 14])
+    return fall
+
+
+# 角度門檻換成弧度，省去每次呼叫的 math.degrees
+ANGLE_LOW = math.radians(50)
+ANGLE_HIGH = math.radians(130)
+
+
+def is_fall_pose(keypoints, bbox):
+    # 單人版本，判斷結果與原本的 FallDetectionLogic.is_fall_pose 相同
+    # 不建立 17 個元素的遮罩，先檢查最便宜的規則，成立就提早返回
+    if len(keypoints) != 17:
+        return False
+    if hasattr(keypoints, "tolist"):
+        keypoints = keypoints.tolist()  # 一次轉成 Python 數值，比逐一讀取 numpy 元素快
+
+    head_x, head_y = keypoints[0]
+    left_shoulder_x, left_shoulder_y = keypoints[5]
+    right_shoulder_x, right_shoulder_y = keypoints[6]
+    left_hip_x, left_hip_y = keypoints[11]
+    right_hip_x, right_hip_y = keypoints[12]
+    left_knee_x, left_knee_y = keypoints[13]
+    right_knee_x, right_knee_y = keypoints[14]
+    # (0, 0) 視為無效的關鍵點
+    head_valid = head_x != 0 or head_y != 0
+    left_hip_valid = left_hip_x != 0 or left_hip_y != 0
+    right_hip_valid = right_hip_x != 0 or right_hip_y != 0
+
+    # 頭和臀部同時低於膝蓋：只有比較運算，最先檢查
+    if head_valid and left_hip_valid and (left_knee_x != 0 or left_knee_y != 0):
+        if head_y >= left_knee_y and left_hip_y >= left_knee_y:
+            return True
+    if head_valid and right_hip_valid and (right_knee_x != 0 or right_knee_y != 0):
+        if head_y >= right_knee_y and right_hip_y >= right_knee_y:
+            return True
+
+    # 身體角度
+    if (left_hip_valid and right_hip_valid and (left_shoulder_x != 0 or left_shoulder_y != 0)
+            and (right_shoulder_x != 0 or right_shoulder_y != 0)):
+        dx = (left_hip_x + right_hip_x) / 2 - (left_shoulder_x + right_shoulder_x) / 2
+        dy = (left_hip_y + right_hip_y) / 2 - (left_shoulder_y + right_shoulder_y) / 2
+        angle = abs(math.atan2(dy, dx))
+        if angle < ANGLE_LOW or angle > ANGLE_HIGH:
+            return True
+
+    # 有效關鍵點至少 13 個時，檢查預測框的寬高比
+    valid_count = 0
+    for x, y in keypoints:
+        if x != 0 or y != 0:
+            valid_count += 1
+    if valid_count >= 13:
+        x1, y1, x2, y2 = bbox
+        if (x2 - x1) / (y2 - y1) > 5 / 3:
+            return True
+    return False
@@ -0,0 +1,113 @@
+# pose_rules_benchmark.py
+
+import argparse
+import math
+import timeit
+import numpy as np
+from pose_rules import is_fall_pose, is_fall_pose_batch
+
+
+def is_fall_pose_reference(keypoints, bbox):
+    # 原本 FallDetectionLogic.is_fall_pose 的實作，作為比對基準
+    if len(keypoints) == 17:
+        head_x, head_y = keypoints[0]
+        left_shoulder_x, left_shoulder_y = keypoints[5]
+        right_shoulder_x, right_shoulder_y = keypoints[6]
+        left_hip_x, left_hip_y = keypoints[11]
+        right_hip_x, right_hip_y = keypoints[12]
+        left_knee_x, left_knee_y = keypoints[13]
+        right_knee_x, right_knee_y = keypoints[14]
+
+        valid_keypoints_mask = [0] * 17
+        for i, (x, y) in enumerate(keypoints):
+            if x == 0 and y == 0:
+                valid_keypoints_mask[i] = 0
+            else:
+                valid_keypoints_mask[i] = 1
+
+        if valid_keypoints_mask[5] and valid_keypoints_mask[6] and valid_keypoints_mask[11] and valid_keypoints_mask[12]:
+            center_up_x = (left_shoulder_x + right_shoulder_x) / 2
+            center_up_y = (left_shoulder_y + right_shoulder_y) / 2
+            center_down_x = (left_hip_x + right_hip_x) / 2
+            center_down_y = (left_hip_y + right_hip_y) / 2
+            dx = center_down_x - center_up_x
+            dy = center_down_y - center_up_y
+            angle = abs(math.degrees(math.atan2(dy, dx)))
+            if angle < 50 or angle > 130:
+                return True
+
+        if sum(valid_keypoints_mask) >= 13:
+            x1, y1, x2, y2 = bbox
+            width = x2 - x1
+            height = y2 - y1
+            if width / height > 5 / 3:
+                return True
+
+        if valid_keypoints_mask[0] and valid_keypoints_mask[11] and valid_keypoints_mask[13]:
+            if head_y >= left_knee_y and left_hip_y >= left_knee_y:
+                return True
+        if valid_keypoints_mask[0] and valid_keypoints_mask[12] and valid_keypoints_mask[14]:
+            if head_y >= right_knee_y and right_hip_y >= right_knee_y:
+                return True
+
+    return False
+
+
+def random_people(count, seed=0, invalid_rate=0.2):
+    # 隨機產生 count 個人的關鍵點與邊界框，部分關鍵點設為 (0, 0) 代表無效
+    # 邊界框與原本呼叫端相同，是整數座標
+    rng = np.random.default_rng(seed)
+    keypoints = rng.uniform(0, 640, (count, 17, 2)).astype(np.float32)
+    invalid = rng.random((count, 17)) < rng.uniform(0, invalid_rate * 2, (count, 1))
+    keypoints[invalid] = 0
+    # 部分人只有整數座標，涵蓋角度與膝蓋比較剛好相等的情況
+    integer = rng.random(count) < 0.2
+    keypoints[integer] = np.round(keypoints[integer] / 32) * 32
+    x1 = rng.uniform(0, 500, count)
+    y1 = rng.uniform(0, 500, count)
+    boxes = np.stack([x1, y1, x1 + rng.uniform(10, 400, count), y1 + rng.uniform(10, 400, count)], axis=1).astype(int)
+    return keypoints, boxes
+
+
+def check_equivalence(keypoints, boxes):
+    # 新實作（單人與批次）的結果必須與原實作完全相同
+    expected = [is_fall_pose_reference(kp, box) for kp, box in zip(keypoints, boxes)]
+    fast = [is_fall_pose(kp, box) for kp, box in zip(keypoints, boxes)]
+    batch = is_fall_pose_batch(keypoints, boxes).tolist()
+    mismatches = [i for i in range(len(expected)) if not (expected[i] == fast[i] == batch[i])]
+    if mismatches:
+        i = mismatches[0]
+        raise AssertionError(f"{len(mismatches)} 筆結果不一致，例如第 {i} 筆：原實作 {expected[i]}，"
+                             f"單人 {fast[i]}，批次 {batch[i]}")
+    return sum(expected)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="姿勢跌倒規則的效能測試與結果比對")
+    parser.add_argument("--people", type=int, default=20000, help="比對用的隨機人數")
+    parser.add_argument("--repeat", type=int, default=5, help="計時重複次數，取最快的一次")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # 不同無效關鍵點比例都比對一次，包含全部無效與全部有效
+    for invalid_rate in (0.0, 0.1, 0.3, 0.5):
+        keypoints, boxes = random_people(args.people, args.seed, invalid_rate)
+        falls = check_equivalence(keypoints, boxes)
+        print(f"無效比例 {invalid_rate:.1f}：{args.people} 筆結果一致（跌倒 {falls} 筆）")
+    empty = np.zeros((1, 17, 2), dtype=np.float32)
+    check_equivalence(empty, np.array([[0, 0, 10, 10]]))
+    print("全部關鍵點無效：結果一致")
+
+    keypoints, boxes = random_people(args.people, args.seed)
+    people = list(zip(keypoints, boxes))
+    cases = [
+        ("原實作", lambda: [is_fall_pose_reference(kp, box) for kp, box in people]),
+        ("單人快速版", lambda: [is_fall_pose(kp, box) for kp, box in people]),
+        ("批次版", lambda: is_fall_pose_batch(keypoints, boxes)),
+    ]
+    baseline = None
+    for name, func in cases:
+        seconds = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        per_person = seconds / args.people * 1e6
+        baseline = baseline or per_person
+        print(f"{name:<8} {per_person:8.2f} µs / 人   加速 {baseline / per_person:5.1f}x")
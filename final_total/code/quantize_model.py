@@ -0,0 +1,78 @@
+import os
+import json
+import time
+from ultralytics import YOLO
+from inference_backend import export_model, model_task
+
+
+def path_size_mb(path):
+    # 模型大小，OpenVINO 匯出的是資料夾
+    if os.path.isdir(path):
+        total = sum(os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(path) for name in files)
+    else:
+        total = os.path.getsize(path)
+    return total / 1024 / 1024
+
+
+if __name__ == '__main__':
+    # 讀取 data.yaml 文件（與 train_model.py 相同），校正使用其中的驗證集
+    data_yaml_path = "C:/Users/洪婉玲/Desktop/113上/project2/model/data.yaml"
+
+    # 設定評估結果保存路徑
+    project_dir = "C:/Users/洪婉玲/Desktop/113上/project2/results"
+    experiment_name = "quantization_" + time.strftime("%Y%m%d_%H%M%S")
+    if not os.path.exists(project_dir):
+        os.makedirs(project_dir)
+
+    # 要量化的模型（train_model.py 訓練出來的權重）
+    weights = ["yolov10best.pt", "yolov11best.pt", "yolo11n-posebest.pt"]
+    # 只用驗證集的一部分做 INT8 校正
+    calibration_fraction = 0.3
+
+    report = []
+    for weight in weights:
+        if not os.path.exists(weight):
+            print(f"找不到 {weight}，略過")
+            continue
+
+        # 產生 FP32 與 INT8 的 OpenVINO 模型
+        variants = [
+            ("pytorch-fp32", weight),
+            ("openvino-fp32", export_model(weight, "openvino")),
+            ("openvino-int8", export_model(weight, "openvino-int8", data=data_yaml_path, fraction=calibration_fraction)),
+        ]
+
+        for name, path in variants:
+            # 在測試集上評估（與 train_model.py 相同的 split='test'），同時取得每張圖的推論時間
+            model = YOLO(path, task=model_task(weight))
+            metrics = model.val(
+                data=data_yaml_path,
+                project=project_dir,
+                name=f"{experiment_name}_{os.path.splitext(weight)[0]}_{name}",
+                device='cpu',
+                batch=1,
+                split='test'
+            )
+            row = {
+                "model": weight,
+                "variant": name,
+                "box_mAP50": float(metrics.box.map50),
+                "box_mAP50-95": float(metrics.box.map),
+                "inference_ms": float(metrics.speed["inference"]),
+                "size_mb": round(path_size_mb(path), 2),
+            }
+            if model_task(weight) == "pose":
+                row["pose_mAP50-95"] = float(metrics.pose.map)
+            report.append(row)
+
+    # 保存並列出比較結果
+    report_path = os.path.join(project_dir, f"{experiment_name}.json")
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"{'模型':<22}{'版本':<16}{'mAP50':>8}{'mAP50-95':>10}{'推論(ms)':>10}{'大小(MB)':>10}")
+    for row in report:
+        print(f"{row['model']:<22}{row['variant']:<16}{row['box_mAP50']:>8.3f}{row['box_mAP50-95']:>10.3f}"
+              f"{row['inference_ms']:>10.1f}{row['size_mb']:>10.2f}")
+    print(f"量化比較結果已保存到 {report_path}")
+    print("FallDetectionLogic 使用 backend=\"openvino-int8\" 即可直接載入 INT8 模型")
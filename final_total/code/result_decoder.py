@@ -0,0 +1,70 @@
+# result_decoder.py
+
+import numpy as np
+
+
+class DecodedResult:
+    # 一幀的偵測結果，全部轉成 NumPy 陣列
+    # boxes: (N, 4) x1, y1, x2, y2；conf: (N,)；cls: (N,) 整數類別
+    # keypoints: (N, 17, 2) 或 None（非姿勢模型）；track_ids: 長度 N 的 list 或 None（沒有追蹤）
+    # pose_matched: 組合模式（框模型 + 姿勢模型）中每個框是否有對應到姿勢，其他模式為 None
+    def __init__(self, boxes, conf, cls, keypoints=None, track_ids=None, pose_matched=None):
+        self.boxes = boxes
+        self.conf = conf
+        self.cls = cls
+        self.keypoints = keypoints
+        self.track_ids = track_ids
+        self.pose_matched = pose_matched
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def class_mask(self, class_id):
+        # 屬於 class_id 的偵測
+        return self.cls == class_id
+
+    def transform(self, gain, offset_x, offset_y):
+        # 座標換算：新座標 = 舊座標 * gain + offset，(0, 0) 的無效關鍵點保持不動
+        # 產生新的陣列，不修改推論結果共用的記憶體
+        self.boxes = self.boxes * gain + np.array([offset_x, offset_y, offset_x, offset_y], dtype=np.float32)
+        if self.keypoints is not None:
+            valid = (self.keypoints[..., 0] != 0) | (self.keypoints[..., 1] != 0)
+            mapped = self.keypoints * gain + np.array([offset_x, offset_y], dtype=np.float32)
+            self.keypoints = np.where(valid[..., None], mapped, 0).astype(np.float32)
+        return self
+
+    def select(self, mask):
+        # 只保留 mask 為 True 的偵測
+        index = np.flatnonzero(mask)
+        return DecodedResult(self.boxes[index], self.conf[index], self.cls[index],
+                             None if self.keypoints is None else self.keypoints[index],
+                             None if self.track_ids is None else [self.track_ids[i] for i in index],
+                             None if self.pose_matched is None else self.pose_matched[index])
+
+
+def to_numpy(tensor):
+    # ultralytics 的結果通常是 torch tensor，也可能已經是 numpy
+    if hasattr(tensor, "cpu"):
+        tensor = tensor.cpu().numpy()
+    return np.asarray(tensor)
+
+
+def decode_result(result):
+    # 每幀只把 boxes.data 與 keypoints 各搬到 CPU / NumPy 一次，不再逐框讀取 tensor 元素
+    if isinstance(result, DecodedResult):
+        return result  # 組合模式的模型直接回傳解碼後的結果
+    if result.boxes is None or len(result.boxes) == 0:
+        data = np.zeros((0, 6), dtype=np.float32)
+        track_ids = None
+    else:
+        data = to_numpy(result.boxes.data)
+        # 有追蹤 ID 時 data 為 x1, y1, x2, y2, id, conf, cls
+        track_ids = data[:, 4].astype(int).tolist() if data.shape[1] == 7 else None
+    keypoints = None
+    if result.keypoints is not None and len(result.keypoints):
+        keypoints = to_numpy(result.keypoints.xy)
+    return DecodedResult(data[:, :4], data[:, -2], data[:, -1].astype(int), keypoints, track_ids)
+
+
+def decode_results(results):
+    return [decode_result(result) for result in results]
@@ -0,0 +1,93 @@
+# roi.py
+
+import json
+import cv2
+import numpy as np
+
+# 設定檔格式（座標為 0~1 的比例，與解析度無關）：
+# {
+#   "0": {"mode": "crop", "regions": [{"name": "bed", "polygon": [[0.1, 0.3], [0.6, 0.3], [0.6, 0.9], [0.1, 0.9]]}]},
+#   "rtsp://192.168.1.10/stream": {"mode": "mask", "regions": [...]},
+#   "default": {...}
+# }
+# key 為攝影機編號、網址或影片路徑，找不到時使用 "default"
+
+
+def load_roi_config(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def roi_for(config, *keys):
+    # 依序用 keys 查詢設定，都沒有就用 "default"，沒有設定回傳 None（整個畫面都偵測）
+    if not config:
+        return None
+    for key in keys + ("default",):
+        entry = config.get(str(key))
+        if entry:
+            return RegionOfInterest([region["polygon"] for region in entry["regions"]], entry.get("mode", "crop"))
+    return None
+
+
+class RegionOfInterest:
+    # 推論前只保留監控區域：crop 裁切到區域的外接矩形並遮蔽區域外的像素，mask 只遮蔽不裁切
+    # 偵測結果再換算回整張畫面的座標，中心點不在區域內的偵測直接捨棄
+    def __init__(self, polygons, mode="crop"):
+        if mode not in ("crop", "mask"):
+            raise ValueError(f"不支援的 ROI 模式：{mode}")
+        self.polygons = [np.asarray(polygon, dtype=np.float32) for polygon in polygons]
+        self.mode = mode
+        self.shape = None  # 以下依畫面大小快取
+        self.mask = None  # 整張畫面的區域遮罩
+        self.rect = None  # 輸入模型的範圍 (x1, y1, x2, y2)
+        self.crop_mask = None  # rect 範圍內的遮罩，區域剛好是矩形時為 None
+        self.buffer = None
+
+    def prepare_shape(self, shape):
+        height, width = shape[:2]
+        self.shape = shape
+        self.mask = np.zeros((height, width), dtype=np.uint8)
+        points = [np.round(polygon * (width, height)).astype(np.int32) for polygon in self.polygons]
+        cv2.fillPoly(self.mask, points, 255)
+        if self.mode == "crop":
+            x, y, w, h = cv2.boundingRect(np.concatenate(points))
+            x1, y1 = max(x, 0), max(y, 0)
+            self.rect = (x1, y1, min(x + w, width), min(y + h, height))
+        else:
+            self.rect = (0, 0, width, height)
+        x1, y1, x2, y2 = self.rect
+        crop_mask = self.mask[y1:y2, x1:x2]
+        self.crop_mask = None if cv2.countNonZero(crop_mask) == crop_mask.size else crop_mask
+        # 區域外的像素一直保持 0，每幀只需複製區域內的像素
+        self.buffer = np.zeros((y2 - y1, x2 - x1) + tuple(shape[2:]), dtype=np.uint8)
+
+    def prepare(self, frame):
+        # 回傳要送進模型的影像，不修改 frame
+        if frame.shape != self.shape:
+            self.prepare_shape(frame.shape)
+        x1, y1, x2, y2 = self.rect
+        crop = frame[y1:y2, x1:x2]
+        if self.crop_mask is None:
+            return crop
+        cv2.copyTo(crop, self.crop_mask, self.buffer)
+        return self.buffer
+
+    def contains(self, boxes):
+        # boxes: (N, 4) 整張畫面座標，回傳中心點是否在區域內
+        height, width = self.mask.shape
+        cx = np.clip(((boxes[:, 0] + boxes[:, 2]) / 2).astype(int), 0, width - 1)
+        cy = np.clip(((boxes[:, 1] + boxes[:, 3]) / 2).astype(int), 0, height - 1)
+        return self.mask[cy, cx] > 0
+
+    def map_results(self, results, frame):
+        # results 為 result_decoder.DecodedResult 列表：平移回整張畫面，並移除區域外的偵測
+        if frame.shape != self.shape:
+            self.prepare_shape(frame.shape)
+        x1, y1 = self.rect[:2]
+        mapped = []
+        for result in results:
+            if x1 or y1:
+                result = result.transform(1.0, x1, y1)
+            keep = self.contains(result.boxes)
+            mapped.append(result if keep.all() else result.select(keep))
+        return mapped
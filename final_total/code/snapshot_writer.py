@@ -0,0 +1,127 @@
+# snapshot_writer.py
+
+import glob
+import os
+import queue
+import threading
+import time
+import cv2
+
+
+def prune_files(pattern, max_files, max_age_days):
+    # 保留策略：刪掉超過 max_age_days 天的檔案，再依數量上限刪掉最舊的，回傳刪除的檔案數
+    files = glob.glob(pattern)
+    files.sort(key=os.path.getmtime)
+    expire = time.time() - max_age_days * 86400 if max_age_days else None
+    remove = len(files) - max_files
+    deleted = 0
+    for path in files:
+        if remove <= 0 and (expire is None or os.path.getmtime(path) >= expire):
+            break
+        try:
+            os.remove(path)
+            deleted += 1
+        except OSError:
+            pass
+        remove -= 1
+    return deleted
+
+
+class SnapshotWriter:
+    # 背景執行緒負責 JPEG 編碼與寫檔，偵測迴圈只需複製一份影像放進佇列
+    # 同一個跌倒事件在 min_interval 秒內只存一張，資料夾超過上限時刪掉最舊的檔案
+    def __init__(self, save_dir, jpeg_quality=90, min_interval=5.0, max_files=500, max_age_days=30, max_queue=8,
+                 telemetry=None):
+        self.save_dir = save_dir
+        self.telemetry = telemetry
+        self.jpeg_quality = jpeg_quality
+        self.min_interval = min_interval
+        self.max_files = max_files
+        self.max_age_days = max_age_days
+        self.last_saved = {}  # event_id -> 上次存檔時間
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.written = 0
+        self.throttled = 0
+        self.dropped = 0
+        self.deleted = 0
+        self.closed = False  # close() 之後送進來的影像直接丟棄
+        if not os.path.exists(self.save_dir):
+            os.makedirs(self.save_dir)
+        self.prune()
+        self.thread = threading.Thread(target=self.worker, daemon=True)
+        self.thread.start()
+
+    def submit(self, frame, event_id, current_time, callback=None):
+        # 回傳將要寫入的檔名，被節流或佇列已滿時回傳 None
+        # callback(filename) 會在檔案寫完之後於背景執行緒呼叫
+        if self.closed:
+            self.dropped += 1
+            return None
+        now = time.perf_counter()
+        last = self.last_saved.get(event_id)
+        if last is not None and now - last < self.min_interval:
+            self.throttled += 1
+            return None
+        self.last_saved[event_id] = now
+        if len(self.last_saved) > 256:
+            self.last_saved = {key: value for key, value in self.last_saved.items() if now - value < self.min_interval}
+
+        # 檔名到微秒並加上事件 ID，不會互相覆蓋
+        timestamp = current_time.strftime("%Y%m%d_%H%M%S_%f")
+        filename = os.path.join(self.save_dir, f"fall_{timestamp}_{event_id}.jpg")
+        try:
+            self.queue.put_nowait((frame.copy(), filename, callback))
+        except queue.Full:
+            self.dropped += 1
+            return None
+        return filename
+
+    def worker(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                break
+            frame, filename, callback = item
+            start = time.perf_counter()
+            try:
+                ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+                if not ok:
+                    print(f"影像編碼失敗：{filename}")
+                    continue
+                with open(filename, "wb") as f:
+                    f.write(buffer.tobytes())
+                self.written += 1
+                if self.telemetry is not None:
+                    self.telemetry.record("snapshot_write", time.perf_counter() - start)
+                if self.written % 20 == 0:
+                    self.prune()
+                if callback is not None:
+                    callback(filename)
+            except Exception as e:
+                print(f"儲存影像失敗：{e}")
+            finally:
+                self.queue.task_done()
+
+    def prune(self):
+        self.deleted += prune_files(os.path.join(self.save_dir, "fall_*.jpg"), self.max_files, self.max_age_days)
+
+    def flush(self, timeout=5):
+        deadline = time.perf_counter() + timeout
+        while self.queue.unfinished_tasks and time.perf_counter() < deadline:
+            time.sleep(0.05)
+
+    def close(self, timeout=5):
+        # 寫完佇列中的影像後結束背景執行緒，可重複呼叫
+        if self.closed:
+            return
+        self.closed = True
+        self.flush(timeout)
+        try:
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self.thread.join(timeout=timeout)
+
+    def summary(self):
+        return f"快照：寫入 {self.written}，節流 {self.throttled}，丟棄 {self.dropped}，刪除 {self.deleted}"
@@ -0,0 +1,227 @@
+# telemetry.py
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class LatencyCounter:
+    # 紀錄單一階段的延遲（秒）
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+        self.lock = threading.Lock()
+
+    def add(self, seconds):
+        with self.lock:
+            self.count += 1
+            self.total += seconds
+            self.last = seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def average(self):
+        with self.lock:
+            return self.total / self.count if self.count else 0.0
+
+    def summary(self):
+        return f"{self.name}: 平均 {self.average() * 1000:.1f} ms, 最大 {self.max * 1000:.1f} ms, 次數 {self.count}"
+
+
+class StageStats:
+    # 單一階段最近 window 筆的耗時（秒），用來計算 p50/p95/p99
+    def __init__(self, window):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+    def percentile(self, q):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))
+        return ordered[index]
+
+
+class Telemetry:
+    # 各階段計時、達成 FPS 與丟幀統計；可輸出 Prometheus 格式的文字檔或本機 HTTP
+    def __init__(self, window=1000, rate_seconds=5.0):
+        self.window = window
+        self.rate_seconds = rate_seconds
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.counters = {}
+        self.ticks = {}  # 計算每秒次數用的時間戳記
+        self.source_fps = 0.0
+        self.server = None
+        self.export_thread = None
+        self.stop_event = threading.Event()
+        self.overlay_cache = []
+        self.overlay_time = 0.0
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        with self.lock:
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = self.stages[name] = StageStats(self.window)
+            stats.add(seconds)
+
+    def increment(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def tick(self, name):
+        # 記錄一次事件並累加計數，rate(name) 取得最近 rate_seconds 秒的每秒次數
+        now = time.perf_counter()
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+            ticks = self.ticks.get(name)
+            if ticks is None:
+                ticks = self.ticks[name] = deque()
+            ticks.append(now)
+            while ticks and now - ticks[0] > self.rate_seconds:
+                ticks.popleft()
+
+    def rate(self, name):
+        now = time.perf_counter()
+        with self.lock:
+            ticks = self.ticks.get(name)
+            if not ticks:
+                return 0.0
+            while ticks and now - ticks[0] > self.rate_seconds:
+                ticks.popleft()
+            if len(ticks) < 2:
+                return 0.0
+            return (len(ticks) - 1) / max(ticks[-1] - ticks[0], 1e-6)
+
+    def set_source_fps(self, fps):
+        self.source_fps = fps if fps and fps > 0 else 0.0
+
+    def snapshot(self):
+        with self.lock:
+            stages = {name: (stats.count, stats.total, list(stats.samples)) for name, stats in self.stages.items()}
+            counters = dict(self.counters)
+        result = {"stages": {}, "counters": counters, "source_fps": self.source_fps,
+                  "achieved_fps": self.rate("frames_processed")}
+        for name, (count, total, samples) in stages.items():
+            stats = StageStats(len(samples) or 1)
+            stats.samples.extend(samples)
+            result["stages"][name] = {"count": count, "total": total, "p50": stats.percentile(50),
+                                      "p95": stats.percentile(95), "p99": stats.percentile(99)}
+        return result
+
+    def prometheus_text(self):
+        data = self.snapshot()
+        lines = ["# TYPE fall_stage_latency_seconds summary"]
+        for name, stats in data["stages"].items():
+            for q in ("p50", "p95", "p99"):
+                quantile = {"p50": "0.5", "p95": "0.95", "p99": "0.99"}[q]
+                lines.append(f'fall_stage_latency_seconds{{stage="{name}",quantile="{quantile}"}} {stats[q]:.6f}')
+            lines.append(f'fall_stage_latency_seconds_sum{{stage="{name}"}} {stats["total"]:.6f}')
+            lines.append(f'fall_stage_latency_seconds_count{{stage="{name}"}} {stats["count"]}')
+        lines.append("# TYPE fall_frames_total counter")
+        for name, value in sorted(data["counters"].items()):
+            lines.append(f'fall_frames_total{{kind="{name}"}} {value}')
+        lines.append("# TYPE fall_fps gauge")
+        lines.append(f'fall_fps{{kind="achieved"}} {data["achieved_fps"]:.3f}')
+        lines.append(f'fall_fps{{kind="source"}} {data["source_fps"]:.3f}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        # 先寫暫存檔再取代，讀取端不會讀到寫一半的檔案
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(temp_path, path)
+
+    def start_file_export(self, path, interval=5.0):
+        # 定期輸出成文字檔（例如給 node_exporter 的 textfile collector）
+        def loop():
+            while not self.stop_event.wait(interval):
+                try:
+                    self.write_prometheus(path)
+                except OSError as e:
+                    print(f"輸出統計檔失敗：{e}")
+        self.export_thread = threading.Thread(target=loop, daemon=True)
+        self.export_thread.start()
+
+    def start_http_server(self, port=9108, host="127.0.0.1"):
+        # http://host:port/metrics 取得 Prometheus 格式的統計
+        telemetry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = telemetry.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"統計資料：http://{host}:{self.server.server_port}/metrics")
+
+    def stop(self):
+        # 停止 HTTP 伺服器並釋放連接埠，下一次偵測才能使用同一個 --metrics-port
+        self.stop_event.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        if self.export_thread is not None:
+            self.export_thread.join(timeout=2)
+            self.export_thread = None
+
+    def overlay_items(self):
+        # 畫面左上角的即時統計（display_sinks.draw_overlays 的格式），每 0.5 秒更新一次
+        now = time.perf_counter()
+        if now - self.overlay_time < 0.5:
+            return self.overlay_cache
+        self.overlay_time = now
+        data = self.snapshot()
+        lines = [f"FPS {data['achieved_fps']:.1f} / {data['source_fps']:.1f}"]
+        for name in ("predict", "end_to_end"):
+            stats = data["stages"].get(name)
+            if stats:
+                lines.append(f"{name} p50 {stats['p50'] * 1000:.0f} p95 {stats['p95'] * 1000:.0f} ms")
+        dropped = data["counters"].get("frames_dropped", 0)
+        lines.append(f"dropped {dropped}")
+        self.overlay_cache = [("text", line, (10, 25 + 22 * i), 0.6, (0, 255, 255), 2) for i, line in enumerate(lines)]
+        return self.overlay_cache
+
+    def summary(self):
+        data = self.snapshot()
+        lines = []
+        for name, stats in data["stages"].items():
+            lines.append(f"{name}: p50 {stats['p50'] * 1000:.1f} ms, p95 {stats['p95'] * 1000:.1f} ms, "
+                         f"p99 {stats['p99'] * 1000:.1f} ms, 次數 {stats['count']}")
+        counters = "，".join(f"{name} {value}" for name, value in sorted(data["counters"].items()))
+        lines.append(f"幀數統計：{counters}")
+        lines.append(f"達成 FPS {data['achieved_fps']:.1f}，來源 FPS {data['source_fps']:.1f}")
+        return "\n".join(lines)
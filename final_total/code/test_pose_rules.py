@@ -0,0 +1,45 @@
+# test_pose_rules.py
+# 姿勢跌倒規則（單人與批次）必須與原實作的結果完全相同，執行：python -m pytest test_pose_rules.py
+
+import numpy as np
+import pytest
+from pose_rules_benchmark import check_equivalence, random_people
+
+
+@pytest.mark.parametrize("invalid_rate", [0.0, 0.1, 0.3, 0.5])
+def test_random_people(invalid_rate):
+    check_equivalence(*random_people(5000, seed=1, invalid_rate=invalid_rate))
+
+
+def test_all_keypoints_invalid():
+    keypoints = np.zeros((3, 17, 2), dtype=np.float32)
+    boxes = np.array([[0, 0, 10, 10], [0, 0, 100, 10], [5, 5, 6, 6]])
+    assert check_equivalence(keypoints, boxes) == 0
+
+
+def upright_person():
+    # 站立的人：頭在最上面，肩、髖、膝由上往下，軀幹垂直（90 度）
+    keypoints = np.full((17, 2), 64, dtype=np.float32)
+    keypoints[0] = [64, 0]
+    keypoints[[5, 6]] = [[48, 32], [80, 32]]
+    keypoints[[11, 12]] = [[48, 128], [80, 128]]
+    keypoints[[13, 14]] = [[48, 192], [80, 192]]
+    keypoints[[15, 16]] = [[48, 256], [80, 256]]
+    return keypoints
+
+
+def test_integer_ties():
+    # 整數座標剛好落在門檻上：寬高比剛好 5/3、頭與膝蓋、髖與膝蓋等高
+    keypoints = np.stack([upright_person() for _ in range(6)])
+    boxes = np.array([[0, 0, 60, 100]] * 6)
+    boxes[1] = [0, 0, 100, 60]  # 寬高比剛好 5/3，不算跌倒
+    keypoints[2, [0, 11, 13], 1] = 192  # 頭、左髖、左膝同一高度
+    keypoints[3, [0, 14], 1] = 192  # 頭與右膝同高，但右髖較高
+    keypoints[4, [11, 12], :] = [[112, 96], [144, 96]]  # 軀幹 45 度
+    keypoints[5, [11, 12], :] = [[-16, 96], [16, 96]]  # 軀幹 135 度
+    expected = [False, False, True, False, True, True]
+    assert check_equivalence(keypoints, boxes) == sum(expected)
+    # 整數座標為主的隨機資料
+    keypoints, boxes = random_people(5000, seed=2)
+    keypoints = np.round(keypoints / 64) * 64
+    check_equivalence(keypoints, boxes)
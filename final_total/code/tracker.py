@@ -0,0 +1,99 @@
+# tracker.py
+
+import numpy as np
+from fall_confirmer import box_iou, greedy_match
+
+# 等速度模型：狀態為 (cx, cy, w, h, vx, vy, vw, vh)，速度以「每幀」為單位
+TRANSITION = np.eye(8)
+TRANSITION[:4, 4:] = np.eye(4)
+MEASUREMENT = np.eye(4, 8)
+# 雜訊與框的高度成比例（與 ByteTrack 的設定相同）
+POSITION_STD = 1 / 20
+VELOCITY_STD = 1 / 160
+
+
+def to_cxcywh(box):
+    x1, y1, x2, y2 = [float(v) for v in box]
+    return np.array([(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1])
+
+
+class KalmanBoxTrack:
+    # 單一個人的卡爾曼濾波器
+    def __init__(self, track_id, box):
+        self.track_id = track_id
+        self.mean = np.zeros(8)
+        self.mean[:4] = to_cxcywh(box)
+        height = max(self.mean[3], 1.0)
+        std = [2 * POSITION_STD * height] * 4 + [10 * VELOCITY_STD * height] * 4
+        self.covariance = np.diag(np.square(std))
+        self.missing = 0  # 連續幾次推論沒有配對到
+        self.since_update = 0  # 距離上次配對經過的幀數
+
+    def predict(self):
+        height = max(self.mean[3], 1.0)
+        noise = np.diag(np.square([POSITION_STD * height] * 4 + [VELOCITY_STD * height] * 4))
+        self.mean = TRANSITION @ self.mean
+        self.mean[2:4] = np.maximum(self.mean[2:4], 1.0)  # 寬高不能變成負的
+        self.covariance = TRANSITION @ self.covariance @ TRANSITION.T + noise
+        self.since_update += 1
+
+    def update(self, box):
+        height = max(self.mean[3], 1.0)
+        noise = np.diag(np.square([POSITION_STD * height] * 4))
+        projected = MEASUREMENT @ self.covariance @ MEASUREMENT.T + noise
+        gain = self.covariance @ MEASUREMENT.T @ np.linalg.inv(projected)
+        self.mean = self.mean + gain @ (to_cxcywh(box) - MEASUREMENT @ self.mean)
+        self.covariance = (np.eye(8) - gain @ MEASUREMENT) @ self.covariance
+        self.missing = 0
+        self.since_update = 0
+
+    def box(self):
+        cx, cy, w, h = self.mean[:4]
+        return np.array([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], dtype=np.float32)
+
+
+class BoxTracker:
+    # 內建的 IoU + 卡爾曼追蹤器：每次推論用預測位置與偵測框的 IoU 配對，給出跨幀固定的 ID
+    # 沒有推論的幀呼叫 predict()，用預測的位置延續畫面上的框
+    def __init__(self, iou_threshold=0.3, max_missing=15, max_predict_frames=30):
+        self.iou_threshold = iou_threshold
+        self.max_missing = max_missing  # 連續幾次推論沒出現就移除
+        self.max_predict_frames = max_predict_frames  # 超過這麼多幀沒配對到就不再顯示預測位置
+        self.tracks = {}  # track_id -> KalmanBoxTrack
+        self.next_id = 1
+
+    def predict(self):
+        # 前進一幀，回傳 [(track_id, box)]
+        predicted = []
+        for track in self.tracks.values():
+            track.predict()
+            if track.missing == 0 and track.since_update <= self.max_predict_frames:
+                predicted.append((track.track_id, track.box()))
+        return predicted
+
+    def update(self, boxes):
+        # 每次推論後呼叫，回傳與 boxes 對應的 track_id 列表
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        for track in self.tracks.values():
+            track.predict()
+        track_ids = list(self.tracks.keys())
+        ids = [None] * len(boxes)
+        if track_ids and len(boxes):
+            iou = box_iou(boxes, [self.tracks[t].box() for t in track_ids])
+            for i, j in greedy_match(iou, self.iou_threshold):
+                ids[i] = track_ids[j]
+                self.tracks[track_ids[j]].update(boxes[i])
+
+        for i, box in enumerate(boxes):
+            if ids[i] is None:
+                ids[i] = self.next_id
+                self.tracks[ids[i]] = KalmanBoxTrack(ids[i], box)
+                self.next_id += 1
+
+        matched = set(ids)
+        for track_id in track_ids:
+            if track_id not in matched:
+                self.tracks[track_id].missing += 1
+                if self.tracks[track_id].missing > self.max_missing:
+                    del self.tracks[track_id]
+        return [int(track_id) for track_id in ids]